@@ -8,6 +8,8 @@ Create Date: 2024-01-01 00:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql.named_types import CreateEnumType
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 # revision identifiers
 revision = '001_init_schema'
@@ -15,12 +17,59 @@ down_revision = None
 branch_labels = None
 depends_on = None
 
+# Indexes on the large, write-heavy tables. These are built with
+# CREATE INDEX CONCURRENTLY so the build only takes a SHARE UPDATE EXCLUSIVE
+# lock instead of blocking writes for the duration of the build.
+#
+# There are no standalone session_id indexes: every table here has a
+# composite index leading with session_id, and PostgreSQL answers
+# `WHERE session_id = ?` from that leading column. Likewise no index repeats
+# the columns (or a prefix) of a unique constraint or unique index, whose own
+# B-tree already serves those lookups.
+CONCURRENT_INDEXES = [
+    # Driver Session Results
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_results_driver_id ON driver_session_results (driver_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_results_team_id ON driver_session_results (team_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_results_position ON driver_session_results (session_id, position)",
+    # Laps
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_laps_driver_id ON laps (driver_id)",
+    # Covering: INCLUDE the LapSchema columns so per-driver lap reads are index-only
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_laps_session_driver_lap ON laps (session_id, driver_id, lap_number) "
+    "INCLUDE (lap_time_sec, sector1_time_sec, sector2_time_sec, sector3_time_sec, is_pit_lap, tyre_compound, tyre_life_laps, track_status)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_laps_session_lap ON laps (session_id, lap_number)",
+    # Stints
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_stints_driver_id ON stints (driver_id)",
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_stints_session_driver_stint ON stints (session_id, driver_id, stint_number)",
+]
+
+# Closed value sets stored as native ENUMs (4 bytes, no per-row length check).
+# Tyre compounds follow FastF1's Compound values (2018 used HYPERSOFT..SUPERHARD).
+SESSION_TYPE_ENUM = postgresql.ENUM(
+    'RACE', 'QUALI', 'FP1', 'FP2', 'FP3', 'SPRINT',
+    name='session_type_enum', create_type=False
+)
+TYRE_COMPOUND_ENUM = postgresql.ENUM(
+    'HYPERSOFT', 'ULTRASOFT', 'SUPERSOFT', 'SOFT', 'MEDIUM', 'HARD', 'SUPERHARD',
+    'INTERMEDIATE', 'WET', 'UNKNOWN', 'TEST_UNKNOWN',
+    name='tyre_compound_enum', create_type=False
+)
+
+# telemetry_frames is hash-partitioned on session_id so per-session queries
+# only touch one partition and its (much smaller) indexes.
+TELEMETRY_PARTITIONS = 16
+
+# laps and telemetry_frames are append-only bulk loads, so they carry no FK
+# constraints: every insert would otherwise pay a lookup into sessions and
+# drivers. Ingestion writes the session and its drivers before any laps or
+# telemetry, which is what keeps the references valid.
+
 
 def upgrade() -> None:
     """Create all tables."""
+    metadata = sa.MetaData()
     
     # Seasons
-    op.create_table('seasons',
+    sa.Table('seasons', metadata,
         sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('year', sa.Integer(), nullable=False),
         sa.Column('created_at', sa.DateTime(), nullable=False),
@@ -28,10 +77,9 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('year')
     )
-    op.create_index('ix_seasons_year', 'seasons', ['year'])
     
     # Races
-    op.create_table('races',
+    sa.Table('races', metadata,
         sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('season_id', sa.Integer(), nullable=False),
         sa.Column('round', sa.Integer(), nullable=False),
@@ -46,14 +94,12 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('season_id', 'round', name='uq_season_round')
     )
-    op.create_index('ix_races_season_id', 'races', ['season_id'])
-    op.create_index('ix_races_season_round', 'races', ['season_id', 'round'])
     
     # Sessions
-    op.create_table('sessions',
+    sa.Table('sessions', metadata,
         sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('race_id', sa.Integer(), nullable=False),
-        sa.Column('session_type', sa.String(length=20), nullable=False),
+        sa.Column('session_type', SESSION_TYPE_ENUM, nullable=False),
         sa.Column('start_time', sa.DateTime(), nullable=True),
         sa.Column('end_time', sa.DateTime(), nullable=True),
         sa.Column('fastf1_identifier', sa.String(length=100), nullable=False),
@@ -63,11 +109,9 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('race_id', 'session_type', name='uq_race_session_type')
     )
-    op.create_index('ix_sessions_race_id', 'sessions', ['race_id'])
-    op.create_index('ix_sessions_race_type', 'sessions', ['race_id', 'session_type'])
     
     # Teams
-    op.create_table('teams',
+    sa.Table('teams', metadata,
         sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('name', sa.String(length=100), nullable=False),
         sa.Column('short_name', sa.String(length=50), nullable=False),
@@ -77,10 +121,9 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('name')
     )
-    op.create_index('ix_teams_name', 'teams', ['name'])
     
     # Drivers
-    op.create_table('drivers',
+    sa.Table('drivers', metadata,
         sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('code', sa.String(length=3), nullable=False),
         sa.Column('full_name', sa.String(length=100), nullable=False),
@@ -91,10 +134,9 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('code')
     )
-    op.create_index('ix_drivers_code', 'drivers', ['code'])
     
     # Driver Session Results
-    op.create_table('driver_session_results',
+    sa.Table('driver_session_results', metadata,
         sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('session_id', sa.Integer(), nullable=False),
         sa.Column('driver_id', sa.Integer(), nullable=False),
@@ -114,14 +156,9 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('session_id', 'driver_id', name='uq_session_driver')
     )
-    op.create_index('ix_results_session_id', 'driver_session_results', ['session_id'])
-    op.create_index('ix_results_driver_id', 'driver_session_results', ['driver_id'])
-    op.create_index('ix_results_team_id', 'driver_session_results', ['team_id'])
-    op.create_index('ix_results_session_driver', 'driver_session_results', ['session_id', 'driver_id'])
-    op.create_index('ix_results_position', 'driver_session_results', ['session_id', 'position'])
     
     # Laps
-    op.create_table('laps',
+    sa.Table('laps', metadata,
         sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('session_id', sa.Integer(), nullable=False),
         sa.Column('driver_id', sa.Integer(), nullable=False),
@@ -131,76 +168,99 @@ def upgrade() -> None:
         sa.Column('sector2_time_sec', sa.Float(), nullable=True),
         sa.Column('sector3_time_sec', sa.Float(), nullable=True),
         sa.Column('is_pit_lap', sa.Boolean(), nullable=False),
-        sa.Column('tyre_compound', sa.String(length=20), nullable=True),
+        sa.Column('tyre_compound', TYRE_COMPOUND_ENUM, nullable=True),
         sa.Column('tyre_life_laps', sa.Integer(), nullable=True),
         sa.Column('track_status', sa.String(length=20), nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
-        sa.ForeignKeyConstraint(['driver_id'], ['drivers.id']),
-        sa.ForeignKeyConstraint(['session_id'], ['sessions.id']),
+        # References: sessions.id, drivers.id (not enforced; see note above)
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('ix_laps_session_id', 'laps', ['session_id'])
-    op.create_index('ix_laps_driver_id', 'laps', ['driver_id'])
-    op.create_index('ix_laps_session_driver_lap', 'laps', ['session_id', 'driver_id', 'lap_number'], unique=True)
-    op.create_index('ix_laps_session_lap', 'laps', ['session_id', 'lap_number'])
     
     # Stints
-    op.create_table('stints',
+    sa.Table('stints', metadata,
         sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('session_id', sa.Integer(), nullable=False),
         sa.Column('driver_id', sa.Integer(), nullable=False),
         sa.Column('stint_number', sa.Integer(), nullable=False),
         sa.Column('start_lap', sa.Integer(), nullable=False),
         sa.Column('end_lap', sa.Integer(), nullable=False),
-        sa.Column('compound', sa.String(length=20), nullable=False),
+        sa.Column('compound', TYRE_COMPOUND_ENUM, nullable=False),
         sa.Column('avg_lap_time_sec', sa.Float(), nullable=False),
         sa.Column('laps_count', sa.Integer(), nullable=False),
         sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
         sa.ForeignKeyConstraint(['driver_id'], ['drivers.id']),
         sa.ForeignKeyConstraint(['session_id'], ['sessions.id']),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('ix_stints_session_id', 'stints', ['session_id'])
-    op.create_index('ix_stints_driver_id', 'stints', ['driver_id'])
-    op.create_index('ix_stints_session_driver_stint', 'stints', ['session_id', 'driver_id', 'stint_number'], unique=True)
-    op.create_index('ix_stints_session_driver', 'stints', ['session_id', 'driver_id'])
     
     # Telemetry Frames
-    op.create_table('telemetry_frames',
-        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Table('telemetry_frames', metadata,
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
         sa.Column('session_id', sa.Integer(), nullable=False),
         sa.Column('driver_id', sa.Integer(), nullable=False),
+        # t_rel_sec stays double: REAL's ~7 digits cannot hold ms over a 2h session
         sa.Column('t_rel_sec', sa.Float(), nullable=False),
         sa.Column('lap_number', sa.Integer(), nullable=False),
-        sa.Column('x_norm', sa.Float(), nullable=False),
-        sa.Column('y_norm', sa.Float(), nullable=False),
-        sa.Column('speed_kph', sa.Float(), nullable=True),
-        sa.Column('throttle', sa.Float(), nullable=True),
-        sa.Column('brake', sa.Float(), nullable=True),
-        sa.Column('gear', sa.Integer(), nullable=True),
-        sa.ForeignKeyConstraint(['driver_id'], ['drivers.id']),
-        sa.ForeignKeyConstraint(['session_id'], ['sessions.id']),
-        sa.PrimaryKeyConstraint('id')
+        sa.Column('x_norm', sa.REAL(), nullable=False),
+        sa.Column('y_norm', sa.REAL(), nullable=False),
+        sa.Column('speed_kph', sa.REAL(), nullable=True),
+        sa.Column('throttle', sa.REAL(), nullable=True),
+        sa.Column('brake', sa.REAL(), nullable=True),
+        sa.Column('gear', sa.SmallInteger(), nullable=True),
+        # References: sessions.id, drivers.id (not enforced; see note above)
+        # The partition key must be part of every unique constraint
+        sa.PrimaryKeyConstraint('id', 'session_id'),
+        # CONCURRENTLY is not supported on partitioned tables; the table is
+        # empty at this point so building these in the transaction is cheap.
+        sa.Index('ix_telemetry_driver_id', 'driver_id'),
+        sa.Index('ix_telemetry_session_driver', 'session_id', 'driver_id'),
+        # Covering index for replay (session_id = ? ORDER BY t_rel_sec, driver_id):
+        # driver_id as a key column gives the full sort order, and the INCLUDE
+        # columns let it run as an index-only scan. Created with the (empty)
+        # table, since CONCURRENTLY is not allowed on a partitioned parent.
+        sa.Index(
+            'ix_telemetry_session_time_driver', 'session_id', 't_rel_sec', 'driver_id',
+            postgresql_include=['lap_number', 'x_norm', 'y_norm', 'speed_kph']
+        ),
+        postgresql_partition_by='HASH (session_id)'
     )
-    op.create_index('ix_telemetry_session_id', 'telemetry_frames', ['session_id'])
-    op.create_index('ix_telemetry_driver_id', 'telemetry_frames', ['driver_id'])
-    op.create_index('ix_telemetry_session_driver_time', 'telemetry_frames', ['session_id', 'driver_id', 't_rel_sec'])
-    op.create_index('ix_telemetry_session_time', 'telemetry_frames', ['session_id', 't_rel_sec'])
     
     # Track Shape Points
-    op.create_table('track_shape_points',
+    sa.Table('track_shape_points', metadata,
         sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
         sa.Column('race_id', sa.Integer(), nullable=False),
         sa.Column('order_index', sa.Integer(), nullable=False),
         sa.Column('x_norm', sa.Float(), nullable=False),
         sa.Column('y_norm', sa.Float(), nullable=False),
         sa.ForeignKeyConstraint(['race_id'], ['races.id']),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_track_shape_race_order', 'race_id', 'order_index', unique=True)
     )
-    op.create_index('ix_track_shape_race_id', 'track_shape_points', ['race_id'])
-    op.create_index('ix_track_shape_race_order', 'track_shape_points', ['race_id', 'order_index'], unique=True)
+    
+    # Emit the whole schema as one script so the tables, their small-table
+    # indexes and the telemetry partitions go to the server in one round-trip
+    # instead of one per statement.
+    dialect = postgresql.dialect()
+    ddl = [
+        str(CreateEnumType(enum).compile(dialect=dialect))
+        for enum in (SESSION_TYPE_ENUM, TYRE_COMPOUND_ENUM)
+    ]
+    for table in metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)).strip())
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            ddl.append(str(CreateIndex(index).compile(dialect=dialect)))
+    for remainder in range(TELEMETRY_PARTITIONS):
+        ddl.append(
+            f"CREATE TABLE telemetry_frames_p{remainder} PARTITION OF telemetry_frames "
+            f"FOR VALUES WITH (MODULUS {TELEMETRY_PARTITIONS}, REMAINDER {remainder})"
+        )
+    op.execute(";\n".join(ddl))
+    
+    # CONCURRENTLY cannot run inside a transaction block, so the index pass
+    # runs in autocommit mode after the tables above have been committed.
+    with op.get_context().autocommit_block():
+        for statement in CONCURRENT_INDEXES:
+            op.execute(statement)
 
 
 def downgrade() -> None:
@@ -214,4 +274,6 @@ def downgrade() -> None:
     op.drop_table('teams')
     op.drop_table('sessions')
     op.drop_table('races')
-    op.drop_table('seasons')
\ No newline at end of file
+    op.drop_table('seasons')
+    op.execute("DROP TYPE IF EXISTS tyre_compound_enum")
+    op.execute("DROP TYPE IF EXISTS session_type_enum")
\ No newline at end of file
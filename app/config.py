@@ -2,7 +2,9 @@
 Configuration module using Pydantic BaseSettings.
 All configuration is loaded from environment variables.
 """
-from functools import lru_cache
+from functools import cached_property, lru_cache
+from typing import Literal
+from pydantic import computed_field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,7 +17,15 @@ class Settings(BaseSettings):
     debug: bool = False
     
     # Database
-    database_url: str = "postgresql://localhost:5432/f1_intelligence"
+    database_url: str = "postgresql+psycopg://localhost:5432/f1_intelligence"
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle: int = 1800  # seconds; stay below the server's idle timeout
+    db_pool_timeout: int = 5  # seconds to wait for a free connection
+    db_query_cache_size: int = 2000  # compiled SQL statements cached per engine
+    # "skip": run `alembic upgrade head` out-of-band (init container / job)
+    # "sync": upgrade during startup; "async": upgrade in the background after startup
+    migration_mode: Literal["sync", "async", "skip"] = "skip"
     
     # LLM Configuration
     llm_provider: str = "ollama"  # Options: "ollama", "openai_compatible"
@@ -23,20 +33,46 @@ class Settings(BaseSettings):
     llm_model_name: str = "llama3"
     llm_api_key: str | None = None
     llm_timeout: int = 60  # seconds
+    llm_max_connections: int = 200  # concurrent connections to the LLM server
+    llm_max_keepalive_connections: int = 100  # idle connections kept open for reuse
+    llm_max_retries: int = 3  # retries on connection errors and 429/502/503/504
+    llm_cache_enabled: bool = True  # answer byte-identical prompts from memory
+    llm_cache_size: int = 1024  # cached LLM responses
     
     # WebSocket Replay
     replay_fps: int = 10  # frames per second for telemetry replay
+    replay_batch_size: int | None = None  # frames per packet (None = max(1, fps // 2))
     
     # FastF1 Cache
     fastf1_cache_dir: str = "./fastf1_cache"
     
     # CORS
-    cors_origins: list[str] = ["http://localhost:3000", "http://localhost:5173"]
+    cors_origins: tuple[str, ...] = ("http://localhost:3000", "http://localhost:5173")
+    cors_allow_credentials: bool = False  # the API is anonymous; enable only if cookies are needed
+    
+    @field_validator("database_url")
+    @classmethod
+    def use_psycopg_driver(cls, value: str) -> str:
+        """Route plain postgresql:// URLs to the psycopg (v3) driver."""
+        for prefix in ("postgresql://", "postgres://"):
+            if value.startswith(prefix):
+                return "postgresql+psycopg://" + value[len(prefix):]
+        return value
+    
+    @computed_field
+    @cached_property
+    def db_host(self) -> str:
+        """Host[:port] part of database_url, safe to log (no credentials)."""
+        netloc = self.database_url.partition("://")[2].split("/")[0]
+        return netloc.rpartition("@")[2] or "configured"
     
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
-        case_sensitive=False
+        case_sensitive=False,
+        # Settings are read-only after startup
+        frozen=True,
+        validate_default=False
     )
 
 
@@ -1,24 +1,65 @@
 # app/core/deps.py
 """FastAPI dependencies."""
-from typing import Generator
-from sqlalchemy.orm import Session
-from fastapi import Depends
+from functools import lru_cache
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Request, Response
 
 from app.db import get_db
 from app.config import Settings, get_settings
+from app.core.exceptions import not_modified
+from app.services.f1_queries_cache import get_race_etag
 from app.services.llm_client import LLMClient, get_llm_client
 
+# Race data is immutable once ingested; let browsers/CDNs keep it and revalidate by ETag
+RACE_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
 
-def get_db_session() -> Generator[Session, None, None]:
+# Settings never change after startup, so resolve them once at import
+SETTINGS = get_settings()
+
+
+async def get_db_session(db: AsyncSession = Depends(get_db)) -> AsyncSession:
     """Get database session dependency."""
-    yield from get_db()
+    return db
 
 
 def get_app_settings() -> Settings:
     """Get application settings dependency."""
-    return get_settings()
+    return SETTINGS
 
 
+@lru_cache()
 def get_llm() -> LLMClient:
-    """Get LLM client dependency."""
-    return get_llm_client(get_settings())
\ No newline at end of file
+    """Get LLM client dependency (one shared instance per process)."""
+    return get_llm_client(SETTINGS)
+
+
+async def race_cache_headers(
+    race_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_session)
+) -> dict[str, str]:
+    """
+    Conditional-request dependency for per-race endpoints.
+    
+    Sets ETag and Cache-Control on the response, and answers 304 before the
+    handler runs if If-None-Match already has the current ETag. Unknown races
+    get no headers, so the handler's 404 is unchanged.
+    
+    Returns:
+        The cache headers (for handlers that build their own Response)
+    """
+    etag = await get_race_etag(db, race_id)
+    if etag is None:
+        return {}
+    
+    headers = {"ETag": etag, "Cache-Control": RACE_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    ):
+        raise not_modified(headers)
+    
+    response.headers.update(headers)
+    return headers
@@ -52,6 +52,14 @@ def driver_not_found(driver_code: str) -> HTTPException:
     )
 
 
+def not_modified(headers: dict[str, str]) -> HTTPException:
+    """Create HTTPException for a conditional request whose ETag still matches (304, no body)."""
+    return HTTPException(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=headers
+    )
+
+
 def llm_error(message: str) -> HTTPException:
     """Create HTTPException for LLM errors."""
     return HTTPException(
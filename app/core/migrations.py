@@ -0,0 +1,63 @@
+# app/core/migrations.py
+"""
+Alembic migration runner used by the application lifespan.
+
+Migrations normally run out-of-band (`alembic upgrade head` as an init
+container or deploy job). MIGRATION_MODE=sync/async runs them from the
+app process instead; with "async" the server starts serving immediately
+and progress is reported on /health/migrations.
+"""
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Last known migration state, surfaced by /health/migrations
+migration_state: dict = {
+    "status": "skipped",  # skipped | pending | running | complete | failed
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+}
+
+
+def _alembic_config() -> Config:
+    """Build an Alembic config that works regardless of the current directory."""
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    # Keep the application's logging setup instead of alembic.ini's
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def run_migrations() -> None:
+    """Upgrade the database to head, recording progress in migration_state."""
+    migration_state.update(status="running", started_at=datetime.utcnow(), finished_at=None, error=None)
+    logger.info("Running database migrations")
+
+    try:
+        command.upgrade(_alembic_config(), "head")
+    except Exception as e:
+        migration_state.update(status="failed", finished_at=datetime.utcnow(), error=str(e))
+        logger.error(f"Database migrations failed: {str(e)}")
+        raise
+
+    migration_state.update(status="complete", finished_at=datetime.utcnow())
+    logger.info("Database migrations complete")
+
+
+async def run_migrations_async() -> None:
+    """Run migrations in a worker thread so the event loop keeps serving requests."""
+    try:
+        await asyncio.to_thread(run_migrations)
+    except Exception:
+        # Already logged and recorded; the app keeps serving and /health/migrations reports it
+        pass
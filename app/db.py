@@ -1,48 +1,280 @@
 """
 Database session management using SQLAlchemy 2.x.
+
+The API runs on an async engine so request handlers never block the event
+loop on database I/O. A sync engine is kept for the ingestion CLI and
+Alembic, which run outside the event loop.
 """
-from typing import Generator
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from datetime import datetime
+from typing import AsyncGenerator, Iterable
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 from app.config import get_settings
 
 settings = get_settings()
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
+# Pool and connection options shared by the sync and async engines
+engine_options = dict(
     echo=settings.debug,
+    echo_pool="debug" if settings.debug else False,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    # Recycle before cloud PG's idle timeout drops the connection
+    pool_recycle=settings.db_pool_recycle,
+    pool_timeout=settings.db_pool_timeout,
+    # Compiled-statement cache (default 500); sized for every query and its
+    # IN-list/filter variants so hot paths never recompile
+    query_cache_size=settings.db_query_cache_size,
+    connect_args={
+        # Switch statements to server-side prepared after 5 executions
+        "prepare_threshold": 5,
+        # TCP keepalives so idle replay connections are not silently dropped
+        "keepalives": 1,
+        "keepalives_idle": 30,
+    },
+)
+
+# Create SQLAlchemy engine (psycopg 3 driver)
+engine = create_engine(
+    settings.database_url,
+    # Batch multi-row INSERTs into INSERT ... VALUES pages
+    use_insertmanyvalues=True,
+    **engine_options
 )
 
-# Create SessionLocal factory
+# Create SessionLocal factory (ingestion / scripts)
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine
 )
 
+# Async engine for the API; psycopg 3 serves both sync and async from the same URL
+async_engine = create_async_engine(
+    settings.database_url,
+    **engine_options
+)
+
+# Create AsyncSessionLocal factory (API requests)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    # Keep loaded attributes usable after commit; an expired attribute would
+    # need an implicit (disallowed) async refresh
+    expire_on_commit=False
+)
+
+# Engine for long-lived replay streams. NullPool gives each stream its own
+# connection, so replays never take connections from the API pool.
+replay_engine = create_async_engine(
+    settings.database_url,
+    echo=settings.debug,
+    poolclass=NullPool,
+    query_cache_size=settings.db_query_cache_size,
+    connect_args=engine_options["connect_args"]
+)
+
+# Create ReplaySessionLocal factory (WebSocket replay streams)
+ReplaySessionLocal = async_sessionmaker(
+    bind=replay_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    FastAPI dependency that provides a database session.
-    
+    FastAPI dependency that provides an async database session.
+
     Yields:
-        Session: SQLAlchemy database session
-        
+        AsyncSession: SQLAlchemy async database session
+
     Usage:
         @app.get("/")
-        def read_root(db: Session = Depends(get_db)):
-            # use db here
-    """
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
\ No newline at end of file
+        async def read_root(db: AsyncSession = Depends(get_db)):
+            result = await db.execute(...)
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+# Column order and binary COPY types for rows passed to bulk_copy_telemetry
+TELEMETRY_COPY_COLUMNS = (
+    ("session_id", "int4"),
+    ("driver_id", "int4"),
+    ("t_rel_sec", "float8"),
+    ("lap_number", "int4"),
+    ("x_norm", "float4"),
+    ("y_norm", "float4"),
+    ("speed_kph", "float4"),
+    ("throttle", "float4"),
+    ("brake", "float4"),
+    ("gear", "int2"),
+)
+
+# Column order and binary COPY types for rows passed to merge_laps.
+# Enum columns are sent as text, which is their binary wire format.
+LAP_COPY_COLUMNS = (
+    ("session_id", "int4"),
+    ("driver_id", "int4"),
+    ("lap_number", "int4"),
+    ("lap_time_sec", "float8"),
+    ("sector1_time_sec", "float8"),
+    ("sector2_time_sec", "float8"),
+    ("sector3_time_sec", "float8"),
+    ("is_pit_lap", "bool"),
+    ("tyre_compound", "text"),
+    ("tyre_life_laps", "int4"),
+    ("track_status", "text"),
+)
+
+# Column order and binary COPY types for rows passed to merge_stints
+STINT_COPY_COLUMNS = (
+    ("session_id", "int4"),
+    ("driver_id", "int4"),
+    ("stint_number", "int4"),
+    ("start_lap", "int4"),
+    ("end_lap", "int4"),
+    ("compound", "text"),
+    ("avg_lap_time_sec", "float8"),
+    ("laps_count", "int4"),
+)
+
+
+def _copy_rows(session: Session, table: str, columns: tuple, rows: list[tuple]) -> int:
+    """Write rows to a table with one binary COPY on the session's connection."""
+    if not rows:
+        return 0
+    
+    column_names = ", ".join(name for name, _ in columns)
+    dbapi_connection = session.connection().connection.driver_connection
+    
+    with dbapi_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {table} ({column_names}) FROM STDIN (FORMAT BINARY)") as copy:
+            copy.set_types([pg_type for _, pg_type in columns])
+            for row in rows:
+                copy.write_row(row)
+    
+    return len(rows)
+
+
+def bulk_copy_telemetry(session: Session, rows: Iterable[tuple]) -> int:
+    """
+    Bulk-load telemetry frames with a single binary COPY.
+    
+    Runs on the session's own connection, so the copy is part of the
+    current transaction (e.g. after deleting a session's old frames).
+    
+    Args:
+        session: Sync SQLAlchemy session (ingestion)
+        rows: Tuples ordered as TELEMETRY_COPY_COLUMNS
+        
+    Returns:
+        Number of rows copied
+    """
+    # Insert in the key order of the replay index (session_id, t_rel_sec,
+    # driver_id), the widest index on the table, so its B-tree inserts walk
+    # consecutive leaf pages instead of landing on random ones
+    rows = sorted(rows, key=lambda row: (row[0], row[2], row[1]))
+    return _copy_rows(session, "telemetry_frames", TELEMETRY_COPY_COLUMNS, rows)
+
+
+def _merge_rows(
+    session: Session,
+    table: str,
+    columns: tuple,
+    key_columns: tuple[str, ...],
+    session_id: int,
+    rows: list[tuple]
+) -> int:
+    """
+    Replace one F1 session's rows in a table via a COPY-loaded staging table.
+    
+    Rows are COPYed into a temporary (unlogged, transaction-scoped) table,
+    then merged with INSERT ... ON CONFLICT on key_columns (which must match
+    a unique index). Unchanged rows are not rewritten, and rows of the session
+    missing from the new data are deleted. Compared with deleting and
+    re-inserting everything, a re-ingest of unchanged data writes almost no
+    WAL and leaves no dead tuples.
+    """
+    staging = f"{table}_staging"
+    names = [name for name, _ in columns]
+    column_list = ", ".join(names)
+    # created_at keeps the time the row was first ingested
+    updated = [name for name in names if name not in key_columns and name != "created_at"]
+    
+    session.execute(text(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT {column_list} FROM {table} WITH NO DATA"
+    ))
+    _copy_rows(session, staging, columns, rows)
+    
+    session.execute(text(
+        f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+        f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET "
+        + ", ".join(f"{name} = EXCLUDED.{name}" for name in updated)
+        + f" WHERE ({', '.join(f'{table}.{name}' for name in updated)})"
+        f" IS DISTINCT FROM ({', '.join(f'EXCLUDED.{name}' for name in updated)})"
+    ))
+    session.execute(
+        text(
+            f"DELETE FROM {table} WHERE session_id = :session_id AND NOT EXISTS ("
+            f"SELECT 1 FROM {staging} WHERE "
+            + " AND ".join(f"{staging}.{name} = {table}.{name}" for name in key_columns)
+            + ")"
+        ),
+        {"session_id": session_id}
+    )
+    session.execute(text(f"DROP TABLE {staging}"))
+    
+    return len(rows)
+
+
+def merge_laps(session: Session, session_id: int, rows: Iterable[tuple]) -> int:
+    """
+    Replace a session's laps with the given rows (see _merge_rows).
+    
+    Args:
+        session: Sync SQLAlchemy session (ingestion)
+        session_id: F1 session whose laps are replaced
+        rows: Tuples ordered as LAP_COPY_COLUMNS; created_at is filled in here
+        
+    Returns:
+        Number of rows merged
+    """
+    created_at = datetime.utcnow()
+    rows = [(*row, created_at) for row in rows]
+    return _merge_rows(
+        session, "laps", LAP_COPY_COLUMNS + (("created_at", "timestamp"),),
+        ("session_id", "driver_id", "lap_number"), session_id, rows
+    )
+
+
+def merge_stints(session: Session, session_id: int, rows: Iterable[tuple]) -> int:
+    """
+    Replace a session's stints with the given rows (see _merge_rows).
+    
+    Args:
+        session: Sync SQLAlchemy session (ingestion)
+        session_id: F1 session whose stints are replaced
+        rows: Tuples ordered as STINT_COPY_COLUMNS; created_at is filled in here
+        
+    Returns:
+        Number of rows merged
+    """
+    created_at = datetime.utcnow()
+    rows = [(*row, created_at) for row in rows]
+    return _merge_rows(
+        session, "stints", STINT_COPY_COLUMNS + (("created_at", "timestamp"),),
+        ("session_id", "driver_id", "stint_number"), session_id, rows
+    )
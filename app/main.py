@@ -2,12 +2,16 @@
 F1 Race Intelligence Backend - FastAPI Application
 """
 # app/main.py
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import get_settings
+from app.core.deps import get_llm
 from app.core.logging import setup_logging, get_logger
+from app.core.migrations import migration_state, run_migrations, run_migrations_async
 
 import app.routers.health as health
 import app.routers.races as races
@@ -31,13 +35,26 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     logger.info(f"LLM Provider: {settings.llm_provider}")
     logger.info(f"LLM Model: {settings.llm_model_name}")
-    logger.info(f"Database: {settings.database_url.split('@')[1] if '@' in settings.database_url else 'configured'}")
+    logger.info(f"Database: {settings.db_host}")
+    logger.info(f"Migration mode: {settings.migration_mode}")
     logger.info("=" * 60)
     
+    migration_task = None
+    if settings.migration_mode == "sync":
+        run_migrations()
+    elif settings.migration_mode == "async":
+        migration_state["status"] = "pending"
+        migration_task = asyncio.create_task(run_migrations_async())
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    if migration_task is not None and not migration_task.done():
+        logger.warning("Shutting down while migrations are still running")
+    # Close the LLM client's connection pool, if a client was created
+    if get_llm.cache_info().currsize:
+        await get_llm().aclose()
 
 
 # Create FastAPI app
@@ -55,16 +72,18 @@ app = FastAPI(
     The chatbot uses actual race data to provide insights about driver performance,
     strategy, and race events.
     """,
+    # orjson renders response bodies several times faster than stdlib json
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Add CORS middleware
+# Add CORS middleware (explicit allowlists; no wildcard matching per preflight)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=sorted(frozenset(settings.cors_origins)),
+    allow_credentials=settings.cors_allow_credentials,
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 # Include routers
@@ -11,18 +11,22 @@ class Base(DeclarativeBase):
     pass
 
 
-class TimestampMixin:
-    """Mixin that adds created_at and updated_at timestamp columns."""
+class CreatedAtMixin:
+    """Mixin that adds a created_at timestamp column (for append-only tables)."""
     
     created_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=datetime.utcnow,
         nullable=False
     )
+
+
+class TimestampMixin(CreatedAtMixin):
+    """Mixin that adds created_at and updated_at timestamp columns."""
     
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=datetime.utcnow,
         onupdate=datetime.utcnow,
         nullable=False
-    )
\ No newline at end of file
+    )
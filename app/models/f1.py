@@ -8,6 +8,7 @@ from sqlalchemy import (
     Integer,
     Float,
     DateTime,
+    Enum,
     ForeignKey,
     UniqueConstraint,
     Index,
@@ -19,6 +20,9 @@ from app.models.base import Base, TimestampMixin
 if TYPE_CHECKING:
     from app.models.telemetry import Lap, Stint, TelemetryFrame, TrackShapePoint
 
+# Values of the session_type_enum PostgreSQL type
+SESSION_TYPES = ("RACE", "QUALI", "FP1", "FP2", "FP3", "SPRINT")
+
 
 class Season(Base, TimestampMixin):
     """F1 season (e.g., 2024)."""
@@ -26,7 +30,7 @@ class Season(Base, TimestampMixin):
     __tablename__ = "seasons"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    year: Mapped[int] = mapped_column(Integer, nullable=False, unique=True, index=True)
+    year: Mapped[int] = mapped_column(Integer, nullable=False, unique=True)
 
     # Relationships
     races: Mapped[list["Race"]] = relationship(
@@ -48,12 +52,16 @@ class Race(Base, TimestampMixin):
     season_id: Mapped[int] = mapped_column(
         ForeignKey("seasons.id"),
         nullable=False,
-        index=True,
     )
     round: Mapped[int] = mapped_column(Integer, nullable=False)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
-    circuit_name: Mapped[str] = mapped_column(String(200), nullable=False)
-    country: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Detail-view text; left out of default SELECTs, load with undefer_group("race_location")
+    circuit_name: Mapped[str] = mapped_column(
+        String(200), nullable=False, deferred=True, deferred_group="race_location", deferred_raiseload=True
+    )
+    country: Mapped[str] = mapped_column(
+        String(100), nullable=False, deferred=True, deferred_group="race_location", deferred_raiseload=True
+    )
     date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     total_laps: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
@@ -71,9 +79,8 @@ class Race(Base, TimestampMixin):
     )
 
     __table_args__ = (
+        # The unique constraint's index also serves (season_id, round) lookups
         UniqueConstraint("season_id", "round", name="uq_season_round"),
-        Index("ix_races_season_id", "season_id"),
-        Index("ix_races_season_round", "season_id", "round"),
     )
 
     def __repr__(self) -> str:
@@ -89,9 +96,11 @@ class Session(Base, TimestampMixin):
     race_id: Mapped[int] = mapped_column(
         ForeignKey("races.id"),
         nullable=False,
-        index=True,
     )
-    session_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    session_type: Mapped[str] = mapped_column(
+        Enum(*SESSION_TYPES, name="session_type_enum"),
+        nullable=False,
+    )
     start_time: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     end_time: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     fastf1_identifier: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -103,10 +112,15 @@ class Session(Base, TimestampMixin):
         back_populates="session",
         cascade="all, delete-orphan",
     )
+    # laps and telemetry_frames can hold thousands to millions of rows per
+    # session, so they never load implicitly; callers must use selectinload()
+    # or query the child table directly.
     laps: Mapped[list["Lap"]] = relationship(
         "Lap",
+        primaryjoin="Session.id == foreign(Lap.session_id)",
         back_populates="session",
         cascade="all, delete-orphan",
+        lazy="raise",
     )
     stints: Mapped[list["Stint"]] = relationship(
         "Stint",
@@ -115,14 +129,15 @@ class Session(Base, TimestampMixin):
     )
     telemetry_frames: Mapped[list["TelemetryFrame"]] = relationship(
         "TelemetryFrame",
+        primaryjoin="Session.id == foreign(TelemetryFrame.session_id)",
         back_populates="session",
         cascade="all, delete-orphan",
+        lazy="raise",
     )
 
     __table_args__ = (
+        # The unique constraint's index also serves (race_id, session_type) lookups
         UniqueConstraint("race_id", "session_type", name="uq_race_session_type"),
-        Index("ix_sessions_race_id", "race_id"),
-        Index("ix_sessions_race_type", "race_id", "session_type"),
     )
 
     def __repr__(self) -> str:
@@ -146,10 +161,6 @@ class Team(Base, TimestampMixin):
         cascade="all, delete-orphan",
     )
 
-    __table_args__ = (
-        Index("ix_teams_name", "name"),
-    )
-
     def __repr__(self) -> str:
         return f"<Team(name={self.name!r})>"
 
@@ -173,6 +184,7 @@ class Driver(Base, TimestampMixin):
     )
     laps: Mapped[list["Lap"]] = relationship(
         "Lap",
+        primaryjoin="Driver.id == foreign(Lap.driver_id)",
         back_populates="driver",
         cascade="all, delete-orphan",
     )
@@ -183,14 +195,11 @@ class Driver(Base, TimestampMixin):
     )
     telemetry_frames: Mapped[list["TelemetryFrame"]] = relationship(
         "TelemetryFrame",
+        primaryjoin="Driver.id == foreign(TelemetryFrame.driver_id)",
         back_populates="driver",
         cascade="all, delete-orphan",
     )
 
-    __table_args__ = (
-        Index("ix_drivers_code", "code"),
-    )
-
     def __repr__(self) -> str:
         return f"<Driver(code={self.code!r}, name={self.full_name!r})>"
 
@@ -204,7 +213,6 @@ class DriverSessionResult(Base, TimestampMixin):
     session_id: Mapped[int] = mapped_column(
         ForeignKey("sessions.id"),
         nullable=False,
-        index=True,
     )
     driver_id: Mapped[int] = mapped_column(
         ForeignKey("drivers.id"),
@@ -221,20 +229,25 @@ class DriverSessionResult(Base, TimestampMixin):
     points: Mapped[float | None] = mapped_column(Float, nullable=True)
     final_status: Mapped[str] = mapped_column(String(50), nullable=False)
     total_race_time_sec: Mapped[float | None] = mapped_column(Float, nullable=True)
-    time_text: Mapped[str | None] = mapped_column(String(50), nullable=True)
-    gap_to_winner_text: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    # Classification text; left out of default SELECTs, load with undefer_group("result_text")
+    time_text: Mapped[str | None] = mapped_column(
+        String(50), nullable=True, deferred=True, deferred_group="result_text", deferred_raiseload=True
+    )
+    gap_to_winner_text: Mapped[str | None] = mapped_column(
+        String(50), nullable=True, deferred=True, deferred_group="result_text", deferred_raiseload=True
+    )
 
     # Relationships
     session: Mapped["Session"] = relationship("Session", back_populates="results")
+    # Not eager on the mapper: queries that read them add selectinload()/joinedload()
     driver: Mapped["Driver"] = relationship("Driver", back_populates="results")
     team: Mapped["Team"] = relationship("Team", back_populates="results")
 
     __table_args__ = (
+        # Also serves (session_id, driver_id) and session_id-only lookups
         UniqueConstraint("session_id", "driver_id", name="uq_session_driver"),
-        Index("ix_results_session_id", "session_id"),
         Index("ix_results_driver_id", "driver_id"),
         Index("ix_results_team_id", "team_id"),
-        Index("ix_results_session_driver", "session_id", "driver_id"),
         Index("ix_results_position", "session_id", "position"),
     )
 
@@ -1,37 +1,63 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import String, Integer, Float, Boolean, ForeignKey, Index
+from sqlalchemy import String, Integer, BigInteger, SmallInteger, Float, REAL, Boolean, Enum, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import Base, TimestampMixin
+from app.models.base import Base, CreatedAtMixin
 
 if TYPE_CHECKING:
     from app.models.f1 import Session, Driver, Race
 
+# Values of the tyre_compound_enum PostgreSQL type (FastF1's Compound values,
+# including the 2018 range: HYPERSOFT..SUPERHARD)
+TYRE_COMPOUNDS = (
+    "HYPERSOFT", "ULTRASOFT", "SUPERSOFT", "SOFT", "MEDIUM", "HARD", "SUPERHARD",
+    "INTERMEDIATE", "WET", "UNKNOWN", "TEST_UNKNOWN",
+)
 
-class Lap(Base, TimestampMixin):
+
+class Lap(Base, CreatedAtMixin):
     """Individual lap data for a driver."""
     
+    # Rewritten only by re-ingest (merged per session), so no updated_at column
     __tablename__ = "laps"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id"), nullable=False, index=True)
-    driver_id: Mapped[int] = mapped_column(ForeignKey("drivers.id"), nullable=False, index=True)
+    # No FK constraints: ingestion writes sessions and drivers before laps
+    session_id: Mapped[int] = mapped_column(Integer, nullable=False)  # References: sessions.id
+    driver_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)  # References: drivers.id
     lap_number: Mapped[int] = mapped_column(Integer, nullable=False)
     lap_time_sec: Mapped[float | None] = mapped_column(Float, nullable=True)
     sector1_time_sec: Mapped[float | None] = mapped_column(Float, nullable=True)
     sector2_time_sec: Mapped[float | None] = mapped_column(Float, nullable=True)
     sector3_time_sec: Mapped[float | None] = mapped_column(Float, nullable=True)
     is_pit_lap: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
-    tyre_compound: Mapped[str | None] = mapped_column(String(20), nullable=True)  # "SOFT", "MEDIUM", "HARD"
+    tyre_compound: Mapped[str | None] = mapped_column(Enum(*TYRE_COMPOUNDS, name="tyre_compound_enum"), nullable=True)
     tyre_life_laps: Mapped[int | None] = mapped_column(Integer, nullable=True)
     track_status: Mapped[str | None] = mapped_column(String(20), nullable=True)  # "1" (green), "2" (yellow), etc.
     
     # Relationships
-    session: Mapped["Session"] = relationship("Session", back_populates="laps")
-    driver: Mapped["Driver"] = relationship("Driver", back_populates="laps")
+    session: Mapped["Session"] = relationship(
+        "Session",
+        primaryjoin="foreign(Lap.session_id) == Session.id",
+        back_populates="laps",
+    )
+    driver: Mapped["Driver"] = relationship(
+        "Driver",
+        primaryjoin="foreign(Lap.driver_id) == Driver.id",
+        back_populates="laps",
+    )
     
+    # No standalone session_id index: the (session_id, ...) composites serve prefix lookups
     __table_args__ = (
-        Index("ix_laps_session_driver_lap", "session_id", "driver_id", "lap_number", unique=True),
+        # INCLUDE the LapSchema columns so per-driver lap reads are index-only scans
+        Index(
+            "ix_laps_session_driver_lap", "session_id", "driver_id", "lap_number",
+            unique=True,
+            postgresql_include=[
+                "lap_time_sec", "sector1_time_sec", "sector2_time_sec", "sector3_time_sec",
+                "is_pit_lap", "tyre_compound", "tyre_life_laps", "track_status",
+            ],
+        ),
         Index("ix_laps_session_lap", "session_id", "lap_number"),
     )
     
@@ -39,18 +65,19 @@ class Lap(Base, TimestampMixin):
         return f"<Lap(session_id={self.session_id}, driver_id={self.driver_id}, lap={self.lap_number})>"
 
 
-class Stint(Base, TimestampMixin):
+class Stint(Base, CreatedAtMixin):
     """Tyre stint for a driver."""
     
+    # Rewritten only by re-ingest (merged per session), so no updated_at column
     __tablename__ = "stints"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id"), nullable=False, index=True)
+    session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id"), nullable=False)
     driver_id: Mapped[int] = mapped_column(ForeignKey("drivers.id"), nullable=False, index=True)
     stint_number: Mapped[int] = mapped_column(Integer, nullable=False)
     start_lap: Mapped[int] = mapped_column(Integer, nullable=False)
     end_lap: Mapped[int] = mapped_column(Integer, nullable=False)
-    compound: Mapped[str] = mapped_column(String(20), nullable=False)  # "SOFT", "MEDIUM", "HARD"
+    compound: Mapped[str] = mapped_column(Enum(*TYRE_COMPOUNDS, name="tyre_compound_enum"), nullable=False)
     avg_lap_time_sec: Mapped[float] = mapped_column(Float, nullable=False)
     laps_count: Mapped[int] = mapped_column(Integer, nullable=False)
     
@@ -59,8 +86,8 @@ class Stint(Base, TimestampMixin):
     driver: Mapped["Driver"] = relationship("Driver", back_populates="stints")
     
     __table_args__ = (
+        # Also serves (session_id, driver_id) prefix lookups
         Index("ix_stints_session_driver_stint", "session_id", "driver_id", "stint_number", unique=True),
-        Index("ix_stints_session_driver", "session_id", "driver_id"),
     )
     
     def __repr__(self) -> str:
@@ -70,27 +97,51 @@ class Stint(Base, TimestampMixin):
 class TelemetryFrame(Base):
     """Single telemetry data point for a driver."""
     
+    # Deliberately no TimestampMixin: frames are immutable and already timed
+    # by t_rel_sec, and created_at/updated_at would add 16 bytes to every row
+    # of the largest table.
     __tablename__ = "telemetry_frames"
     
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id"), nullable=False, index=True)
-    driver_id: Mapped[int] = mapped_column(ForeignKey("drivers.id"), nullable=False, index=True)
-    t_rel_sec: Mapped[float] = mapped_column(Float, nullable=False)  # Time since session start
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # No FK constraints: ingestion writes sessions and drivers before telemetry.
+    # Part of the primary key because it is the partition key.
+    session_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)  # References: sessions.id
+    driver_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)  # References: drivers.id
+    t_rel_sec: Mapped[float] = mapped_column(Float, nullable=False)  # Time since lap start (kept double for ms precision)
     lap_number: Mapped[int] = mapped_column(Integer, nullable=False)
-    x_norm: Mapped[float] = mapped_column(Float, nullable=False)  # Normalized 0..1
-    y_norm: Mapped[float] = mapped_column(Float, nullable=False)  # Normalized 0..1
-    speed_kph: Mapped[float | None] = mapped_column(Float, nullable=True)
-    throttle: Mapped[float | None] = mapped_column(Float, nullable=True)  # 0..1
-    brake: Mapped[float | None] = mapped_column(Float, nullable=True)  # 0..1
-    gear: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Samples are 4-byte REAL / 2-byte SMALLINT; none need double precision
+    x_norm: Mapped[float] = mapped_column(REAL, nullable=False)  # Normalized 0..1
+    y_norm: Mapped[float] = mapped_column(REAL, nullable=False)  # Normalized 0..1
+    speed_kph: Mapped[float | None] = mapped_column(REAL, nullable=True)
+    throttle: Mapped[float | None] = mapped_column(REAL, nullable=True)  # 0..1
+    brake: Mapped[float | None] = mapped_column(REAL, nullable=True)  # 0..1
+    gear: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
     
     # Relationships
-    session: Mapped["Session"] = relationship("Session", back_populates="telemetry_frames")
-    driver: Mapped["Driver"] = relationship("Driver", back_populates="telemetry_frames")
+    session: Mapped["Session"] = relationship(
+        "Session",
+        primaryjoin="foreign(TelemetryFrame.session_id) == Session.id",
+        back_populates="telemetry_frames",
+    )
+    driver: Mapped["Driver"] = relationship(
+        "Driver",
+        primaryjoin="foreign(TelemetryFrame.driver_id) == Driver.id",
+        back_populates="telemetry_frames",
+    )
     
     __table_args__ = (
-        Index("ix_telemetry_session_driver_time", "session_id", "driver_id", "t_rel_sec"),
-        Index("ix_telemetry_session_time", "session_id", "t_rel_sec"),
+        Index("ix_telemetry_session_driver", "session_id", "driver_id"),
+        # Covers the replay read, in its (t_rel_sec, driver_id) order, so it
+        # is served by an index-only scan with no sort
+        Index(
+            "ix_telemetry_session_time_driver",
+            "session_id",
+            "t_rel_sec",
+            "driver_id",
+            postgresql_include=["lap_number", "x_norm", "y_norm", "speed_kph"],
+        ),
+        # Hash-partitioned on session_id (partitions are created by the migration)
+        {"postgresql_partition_by": "HASH (session_id)"},
     )
     
     def __repr__(self) -> str:
@@ -103,7 +154,7 @@ class TrackShapePoint(Base):
     __tablename__ = "track_shape_points"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    race_id: Mapped[int] = mapped_column(ForeignKey("races.id"), nullable=False, index=True)
+    race_id: Mapped[int] = mapped_column(ForeignKey("races.id"), nullable=False)
     order_index: Mapped[int] = mapped_column(Integer, nullable=False)
     x_norm: Mapped[float] = mapped_column(Float, nullable=False)  # Normalized 0..1
     y_norm: Mapped[float] = mapped_column(Float, nullable=False)  # Normalized 0..1
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import TypeAdapter
 from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db_session
+from app.core.deps import get_db_session, race_cache_headers
 from app.core.exceptions import race_not_found
-from app.models.f1 import Season, Race, Session as SessionModel, DriverSessionResult
+from app.models.f1 import Season, Race
 from app.schemas.f1 import (
     SeasonSchema,
     RaceListSchema,
@@ -16,12 +17,18 @@ from app.schemas.f1 import (
     PodiumDriverSchema,
 )
 from app.services import f1_queries
+from app.services.f1_queries_cache import get_race_main_session_id
 
 router = APIRouter(prefix="/seasons", tags=["Races"])
 
+# Whole-list validators, built once (one call per response instead of one per row)
+RACE_LIST_ADAPTER = TypeAdapter(list[RaceListSchema])
+RESULT_LIST_ADAPTER = TypeAdapter(list[ResultSchema])
+DRIVER_LIST_ADAPTER = TypeAdapter(list[DriverWithTeamSchema])
+
 
 @router.get("", response_model=list[SeasonSchema])
-async def list_seasons(db: Session = Depends(get_db_session)) -> list[SeasonSchema]:
+async def list_seasons(db: AsyncSession = Depends(get_db_session)) -> list[SeasonSchema]:
     """
     List all seasons with race counts.
     """
@@ -35,7 +42,7 @@ async def list_seasons(db: Session = Depends(get_db_session)) -> list[SeasonSche
         .order_by(Season.year.desc())
     )
 
-    results = db.execute(stmt).all()
+    results = (await db.execute(stmt)).all()
 
     return [
         SeasonSchema(year=season.year, race_count=race_count)
@@ -46,45 +53,58 @@ async def list_seasons(db: Session = Depends(get_db_session)) -> list[SeasonSche
 @router.get("/{year}/races", response_model=list[RaceListSchema])
 async def list_races(
     year: int,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
 ) -> list[RaceListSchema]:
     """
     List all races in a given season (by year).
     """
     stmt = select(Season).where(Season.year == year)
-    season = db.execute(stmt).scalar_one_or_none()
+    season = (await db.execute(stmt)).scalar_one_or_none()
 
     if not season:
         raise HTTPException(status_code=404, detail=f"Season {year} not found")
 
+    # Only the RaceListSchema columns, as plain rows (no ORM instances)
     stmt = (
-        select(Race)
+        select(
+            Race.id,
+            Race.season_id,
+            Race.round,
+            Race.name,
+            Race.circuit_name,
+            Race.country,
+            Race.date,
+            Race.total_laps
+        )
         .where(Race.season_id == season.id)
         .order_by(Race.round)
     )
-    races = db.execute(stmt).scalars().all()
+    races = (await db.execute(stmt)).all()
 
-    return [RaceListSchema.model_validate(race) for race in races]
+    return RACE_LIST_ADAPTER.validate_python(races, from_attributes=True)
 
 
-@router.get("/{race_id}", response_model=RaceDetailSchema)
+@router.get(
+    "/{race_id}",
+    response_model=RaceDetailSchema,
+    dependencies=[Depends(race_cache_headers)],
+)
 async def get_race(
     race_id: int,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
 ) -> RaceDetailSchema:
     """
     Get detailed information about a race.
     """
     try:
-        race = f1_queries.get_race_by_id(db, race_id)
+        race = await f1_queries.get_race_by_id(db, race_id, include_location=True)
     except Exception:
         raise race_not_found(race_id)
 
     # Try to get main session (e.g. RACE)
     main_session_id: int | None = None
     try:
-        session = f1_queries.get_race_main_session(db, race_id)
-        main_session_id = session.id
+        main_session_id = await get_race_main_session_id(db, race_id)
     except Exception:
         # If main session not found, just leave as None
         pass
@@ -102,118 +122,99 @@ async def get_race(
     )
 
 
-@router.get("/{race_id}/summary", response_model=RaceSummarySchema)
+@router.get(
+    "/{race_id}/summary",
+    response_model=RaceSummarySchema,
+    dependencies=[Depends(race_cache_headers)],
+)
 async def get_race_summary(
     race_id: int,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
 ) -> RaceSummarySchema:
     """
     Get high-level race summary (winner, podium, counts).
     """
     try:
-        race = f1_queries.get_race_by_id(db, race_id)
-        session = f1_queries.get_race_main_session(db, race_id)
+        race = await f1_queries.get_race_by_id(db, race_id)
+        session_id = await get_race_main_session_id(db, race_id)
     except Exception:
         raise race_not_found(race_id)
 
-    # Get classification
-    results: list[DriverSessionResult] = f1_queries.get_race_results(db, session.id)
+    # Podium rows plus one aggregate for the counts, instead of the full classification
+    podium_results = await f1_queries.get_race_podium(db, session_id)
+    total, finished, dnf = await f1_queries.get_race_counts(db, session_id)
+
+    # Podium
+    podium: list[PodiumDriverSchema] = [
+        PodiumDriverSchema(
+            position=result.position,
+            driver_code=result.driver.code,
+            driver_name=result.driver.full_name,
+            team=result.team.short_name,
+        )
+        for result in podium_results
+    ]
 
     # Winner
     winner: WinnerSchema | None = None
-    if results and results[0].position == 1:
+    if podium and podium[0].position == 1:
         winner = WinnerSchema(
-            driver_code=results[0].driver.code,
-            driver_name=results[0].driver.full_name,
-            team=results[0].team.short_name,
+            driver_code=podium[0].driver_code,
+            driver_name=podium[0].driver_name,
+            team=podium[0].team,
         )
 
-    # Podium
-    podium: list[PodiumDriverSchema] = []
-    for result in results[:3]:
-        if result.position and result.position <= 3:
-            podium.append(
-                PodiumDriverSchema(
-                    position=result.position,
-                    driver_code=result.driver.code,
-                    driver_name=result.driver.full_name,
-                    team=result.team.short_name,
-                )
-            )
-
-    # Finishers vs DNF
-    finished = sum(1 for r in results if r.final_status == "Finished")
-    dnf = sum(
-        1
-        for r in results
-        if "DNF" in r.final_status
-        or r.final_status not in ["Finished", "+1 Lap", "+2 Laps"]
-    )
-
     return RaceSummarySchema(
         race_id=race.id,
         race_name=race.name,
         winner=winner,
         podium=podium,
         total_laps=race.total_laps or 0,
-        total_drivers=len(results),
+        total_drivers=total,
         finished_drivers=finished,
         dnf_count=dnf,
     )
 
 
-@router.get("/{race_id}/results", response_model=list[ResultSchema])
+@router.get(
+    "/{race_id}/results",
+    response_model=list[ResultSchema],
+    dependencies=[Depends(race_cache_headers)],
+)
 async def get_race_results(
     race_id: int,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
 ) -> list[ResultSchema]:
     """
     Get race classification/results (per driver).
     """
     try:
-        session = f1_queries.get_race_main_session(db, race_id)
+        session_id = await get_race_main_session_id(db, race_id)
     except Exception:
         raise race_not_found(race_id)
 
-    results: list[DriverSessionResult] = f1_queries.get_race_results(db, session.id)
+    rows = await f1_queries.get_race_result_rows(db, session_id)
 
-    return [
-        ResultSchema(
-            position=r.position,
-            driver_code=r.driver.code,
-            driver_name=r.driver.full_name,
-            team=r.team.short_name,
-            points=r.points,
-            time_text=r.time_text,
-            gap_to_winner_text=r.gap_to_winner_text,
-            final_status=r.final_status,
-            grid_position=r.grid_position,
-        )
-        for r in results
-    ]
+    return RESULT_LIST_ADAPTER.validate_python([row._mapping for row in rows])
 
 
-@router.get("/{race_id}/drivers", response_model=list[DriverWithTeamSchema])
+@router.get(
+    "/{race_id}/drivers",
+    response_model=list[DriverWithTeamSchema],
+    dependencies=[Depends(race_cache_headers)],
+)
 async def get_race_drivers(
     race_id: int,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
 ) -> list[DriverWithTeamSchema]:
     """
     Get all drivers who participated in a race.
     """
     try:
-        session = f1_queries.get_race_main_session(db, race_id)
+        session_id = await get_race_main_session_id(db, race_id)
     except Exception:
         raise race_not_found(race_id)
 
-    results: list[DriverSessionResult] = f1_queries.get_race_results(db, session.id)
+    rows = await f1_queries.get_session_driver_rows(db, session_id)
 
-    return [
-        DriverWithTeamSchema(
-            id=r.driver.id,
-            code=r.driver.code,
-            full_name=r.driver.full_name,
-            team=r.team.short_name,
-        )
-        for r in results
-    ]
+    return DRIVER_LIST_ADAPTER.validate_python([row._mapping for row in rows])
@@ -2,15 +2,21 @@
 """
 Realtime race replay / live position endpoints (WebSocket).
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
+
+from app.core.deps import get_app_settings
+from app.db import AsyncSessionLocal
 from app.core.logging import get_logger
+from app.config import Settings
+from app.services import replay_service
+from app.services.f1_queries_cache import get_race_main_session_id
 
-router = APIRouter(prefix="/realtime", tags=["Realtime"])
+router = APIRouter(tags=["Realtime"])
 
 logger = get_logger(__name__)
 
 
-@router.websocket("/echo")
+@router.websocket("/realtime/echo")
 async def echo_endpoint(websocket: WebSocket):
     """
     Simple echo WebSocket for testing.
@@ -30,7 +36,7 @@ async def echo_endpoint(websocket: WebSocket):
         logger.info("Echo client disconnected")
 
 
-@router.websocket("/race/{race_id}/session/{session_type}")
+@router.websocket("/realtime/race/{race_id}/session/{session_type}")
 async def realtime_race_session(
     websocket: WebSocket,
     race_id: int,
@@ -55,3 +61,76 @@ async def realtime_race_session(
         }
     )
     await websocket.close()
+
+
+@router.websocket("/ws/races/{race_id}/replay")
+async def replay_race(
+    websocket: WebSocket,
+    race_id: int,
+    fmt: str = Query("msgpack", pattern="^(msgpack|json)$"),
+    settings: Settings = Depends(get_app_settings)
+):
+    """
+    WebSocket endpoint for replaying race telemetry.
+    
+    Streams car positions for visualization on a track map, several frames
+    per message (REPLAY_BATCH_SIZE). Messages are MessagePack binary frames
+    by default (about half the size of JSON); pass ?fmt=json for JSON text
+    frames.
+    
+    Usage:
+        ws = new WebSocket("ws://localhost:8000/ws/races/123/replay")
+        ws.binaryType = "arraybuffer"
+        ws.onmessage = (event) => {
+            const packet = msgpack.decode(new Uint8Array(event.data))
+            // packet.t0: time of the first frame
+            for (const frame of packet.frames) {
+                // frame.t: current time in seconds; play it frame.t - packet.t0 after the packet
+                // frame.cars: array of {driver_code, x, y, speed_kph, lap}
+            }
+        }
+    
+        // JSON fallback
+        ws = new WebSocket("ws://localhost:8000/ws/races/123/replay?fmt=json")
+        ws.onmessage = (event) => { const packet = JSON.parse(event.data) }
+    """
+    await websocket.accept()
+    logger.info(f"WebSocket connected for race {race_id} replay ({fmt})")
+    
+    if fmt == "json":
+        async def send(payload: dict) -> None:
+            await websocket.send_text(replay_service.dump_message(payload))
+    else:
+        async def send(payload: dict) -> None:
+            await websocket.send_bytes(replay_service.pack_message(payload))
+    
+    try:
+        # Get session on a short-lived DB session; the stream itself must not
+        # pin a pooled connection for its whole duration
+        async with AsyncSessionLocal() as db:
+            session_id = await get_race_main_session_id(db, race_id)
+        
+        # Start replay
+        await replay_service.replay_session_websocket(
+            session_id=session_id,
+            fps=settings.replay_fps,
+            send_callback=send,
+            batch_size=settings.replay_batch_size
+        )
+        
+        # Send completion message
+        await send({"status": "complete"})
+        
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket disconnected for race {race_id}")
+    except Exception as e:
+        logger.error(f"WebSocket error: {str(e)}")
+        try:
+            await send({"error": str(e)})
+        except:
+            pass
+    finally:
+        try:
+            await websocket.close()
+        except:
+            pass
@@ -1,8 +1,9 @@
 """Telemetry endpoints."""
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db_session
+from app.core.deps import get_db_session, race_cache_headers
 from app.core.exceptions import race_not_found, driver_not_found
 from app.schemas.telemetry import (
     StintSchema,
@@ -11,33 +12,42 @@ from app.schemas.telemetry import (
     TrackShapePointSchema
 )
 from app.services import f1_queries
+from app.services.f1_queries_cache import get_race_main_session_id, get_track_shape_json
 
 router = APIRouter(prefix="/races", tags=["Telemetry"])
 
+# Whole-list validators, built once (one call per response instead of one per row)
+STINT_LIST_ADAPTER = TypeAdapter(list[StintSchema])
+LAP_LIST_ADAPTER = TypeAdapter(list[LapSchema])
 
-@router.get("/{race_id}/stints", response_model=list[DriverStintsSchema])
+
+@router.get(
+    "/{race_id}/stints",
+    response_model=list[DriverStintsSchema],
+    dependencies=[Depends(race_cache_headers)]
+)
 async def get_stints(
     race_id: int,
     driver_code: str | None = Query(None, description="Filter by driver code"),
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session)
 ) -> list[DriverStintsSchema]:
     """Get stint data for a race, optionally filtered by driver."""
     try:
-        session = f1_queries.get_race_main_session(db, race_id)
+        session_id = await get_race_main_session_id(db, race_id)
     except:
         raise race_not_found(race_id)
     
     if driver_code:
         # Single driver
         try:
-            driver = f1_queries.get_driver_by_code(db, driver_code)
+            driver = await f1_queries.get_driver_by_code(db, driver_code)
         except:
             raise driver_not_found(driver_code)
         
-        stints = f1_queries.get_driver_stints(db, session.id, driver.id)
+        stints = await f1_queries.get_driver_stints(db, session_id, driver.id)
         
         # Get team info from results
-        results = f1_queries.get_race_results(db, session.id)
+        results = await f1_queries.get_race_results(db, session_id)
         driver_result = next((r for r in results if r.driver_id == driver.id), None)
         team_name = driver_result.team.short_name if driver_result else "Unknown"
         
@@ -46,20 +56,13 @@ async def get_stints(
                 driver_code=driver.code,
                 driver_name=driver.full_name,
                 team=team_name,
-                stints=[StintSchema.model_validate(s) for s in stints]
+                stints=STINT_LIST_ADAPTER.validate_python(stints, from_attributes=True)
             )
         ]
     else:
         # All drivers
-        results = f1_queries.get_race_results(db, session.id)
-        all_stints = f1_queries.get_all_session_stints(db, session.id)
-        
-        # Group stints by driver
-        driver_stint_map = {}
-        for stint in all_stints:
-            if stint.driver_id not in driver_stint_map:
-                driver_stint_map[stint.driver_id] = []
-            driver_stint_map[stint.driver_id].append(stint)
+        results = await f1_queries.get_race_results(db, session_id)
+        driver_stint_map = await f1_queries.get_session_stints_by_driver(db, session_id)
         
         # Build response
         response = []
@@ -72,25 +75,29 @@ async def get_stints(
                     driver_code=driver.code,
                     driver_name=driver.full_name,
                     team=result.team.short_name,
-                    stints=[StintSchema.model_validate(s) for s in stints]
+                    stints=STINT_LIST_ADAPTER.validate_python(stints, from_attributes=True)
                 )
             )
         
         return response
 
 
-@router.get("/{race_id}/laps", response_model=list[LapSchema])
+@router.get(
+    "/{race_id}/laps",
+    response_model=list[LapSchema],
+    dependencies=[Depends(race_cache_headers)]
+)
 async def get_laps(
     race_id: int,
     driver_code: str = Query(..., description="Driver code (required)"),
     lap_start: int | None = Query(None, description="Start lap number"),
     lap_end: int | None = Query(None, description="End lap number"),
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session)
 ) -> list[LapSchema]:
     """Get lap data for a specific driver in a race."""
     try:
-        session = f1_queries.get_race_main_session(db, race_id)
-        driver = f1_queries.get_driver_by_code(db, driver_code)
+        session_id = await get_race_main_session_id(db, race_id)
+        driver = await f1_queries.get_driver_by_code(db, driver_code)
     except:
         raise race_not_found(race_id)
     
@@ -99,22 +106,22 @@ async def get_laps(
     if lap_start is not None and lap_end is not None:
         lap_range = (lap_start, lap_end)
     
-    laps = f1_queries.get_driver_laps(db, session.id, driver.id, lap_range)
+    laps = await f1_queries.get_driver_laps(db, session_id, driver.id, lap_range)
     
-    return [LapSchema.model_validate(lap) for lap in laps]
+    # Rows go straight from the result into the validator (no intermediate list)
+    return LAP_LIST_ADAPTER.validate_python(laps, from_attributes=True)
 
 
 @router.get("/{race_id}/track-shape", response_model=list[TrackShapePointSchema])
 async def get_track_shape(
     race_id: int,
-    db: Session = Depends(get_db_session)
-) -> list[TrackShapePointSchema]:
-    """Get track shape polyline for a race."""
+    db: AsyncSession = Depends(get_db_session),
+    cache_headers: dict[str, str] = Depends(race_cache_headers)
+) -> Response:
+    """Get track shape polyline for a race (served from the per-race JSON cache)."""
     try:
-        f1_queries.get_race_by_id(db, race_id)
+        blob = await get_track_shape_json(db, race_id)
     except:
         raise race_not_found(race_id)
     
-    points = f1_queries.get_track_shape(db, race_id)
-    
-    return [TrackShapePointSchema.model_validate(p) for p in points]
\ No newline at end of file
+    return Response(content=blob, media_type="application/json", headers=cache_headers)
@@ -1,5 +1,6 @@
 # app/schemas/common.py
 """Common response schemas."""
+from datetime import datetime
 from pydantic import BaseModel
 
 
@@ -8,6 +9,15 @@ class HealthResponse(BaseModel):
     status: str
 
 
+class MigrationStatusResponse(BaseModel):
+    """Database migration status response."""
+    mode: str
+    status: str
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+
+
 # app/schemas/f1.py
 """F1-related schemas."""
 from datetime import datetime
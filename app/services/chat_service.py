@@ -1,20 +1,22 @@
 """
 Chat service for data-aware race Q&A using LLM.
 """
-import json
-from sqlalchemy.orm import Session
+import re
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.core.logging import get_logger
 from app.services.llm_client import LLMClient
 from app.services import f1_queries
+from app.services.f1_queries_cache import chat_answers, chat_contexts, get_race_etag, get_race_main_session_id
 from app.schemas.chat import ChatFocus, ChatResponse, UsedContext
-from app.core.exceptions import DriverNotFoundException
 
 logger = get_logger(__name__)
 
 
-def build_system_prompt() -> str:
-    """Build system prompt for the LLM."""
-    return """You are an F1 race analysis assistant with deep knowledge of Formula 1 racing, strategy, and telemetry data.
+# Kept byte-identical across requests (and ahead of anything request-specific)
+# so providers with prompt/prefix caching can reuse it
+SYSTEM_PROMPT = """You are an F1 race analysis assistant with deep knowledge of Formula 1 racing, strategy, and telemetry data.
 
 Your role:
 - Analyze F1 race data to provide insightful explanations about driver performance, race strategy, and race events
@@ -37,8 +39,8 @@ When analyzing:
 - Consider track position and strategy implications"""
 
 
-def build_context_dict(
-    db: Session,
+async def build_context_dict(
+    db: AsyncSession,
     race_id: int,
     session_id: int,
     driver_codes: list[str],
@@ -58,10 +60,10 @@ def build_context_dict(
         Dictionary with race context data
     """
     # Get race info
-    race = f1_queries.get_race_by_id(db, race_id)
+    race = await f1_queries.get_race_by_id(db, race_id, include_location=True)
     
     # Get race results for context
-    results = f1_queries.get_race_results(db, session_id)
+    results = await f1_queries.get_race_results(db, session_id, include_text=True)
     
     # Build podium
     podium = []
@@ -83,69 +85,98 @@ def build_context_dict(
             "circuit": race.circuit_name,
             "country": race.country,
             "total_laps": race.total_laps,
-            "date": race.date.isoformat()
+            "date": race.date  # serialized by orjson as ISO 8601
         },
         "podium": podium,
         "lap_range": lap_range if lap_range else [1, race.total_laps or 0],
         "drivers": []
     }
     
-    # If specific drivers requested, add detailed data for them
+    # If specific drivers requested, add detailed data for them. Each lookup
+    # below is one query for all requested drivers together.
     if driver_codes:
+        # Results already carry their (eager-loaded) drivers; only codes of
+        # drivers without a result need the drivers table
+        results_by_driver_id = {r.driver_id: r for r in results}
+        drivers_by_code = {r.driver.code: r.driver for r in results}
+        missing_codes = [code for code in driver_codes if code.upper() not in drivers_by_code]
+        if missing_codes:
+            drivers_by_code.update(await f1_queries.get_drivers_by_codes(db, missing_codes))
+        driver_ids = [
+            drivers_by_code[code.upper()].id for code in driver_codes if code.upper() in drivers_by_code
+        ]
+        
+        stints_by_driver_id = await f1_queries.get_session_stints_by_driver(db, session_id, driver_ids)
+        lap_summaries = await f1_queries.get_lap_summaries(db, session_id, driver_ids, lap_range)
+        
         for code in driver_codes:
-            try:
-                driver = f1_queries.get_driver_by_code(db, code)
-                
-                # Get driver's result
-                driver_result = next(
-                    (r for r in results if r.driver_id == driver.id),
-                    None
-                )
-                
-                # Get stints
-                stints = f1_queries.get_driver_stints(db, session_id, driver.id)
-                stints_data = [
-                    {
-                        "stint": s.stint_number,
-                        "compound": s.compound,
-                        "laps": f"{s.start_lap}-{s.end_lap}",
-                        "laps_count": s.laps_count,
-                        "avg_lap_time_sec": round(s.avg_lap_time_sec, 3)
-                    }
-                    for s in stints
-                ]
-                
-                # Get lap statistics
-                lap_stats = f1_queries.get_lap_statistics(
-                    db, session_id, driver.id, lap_range
-                )
-                
-                # Get pit stop count
-                pit_stops = f1_queries.count_pit_stops(db, session_id, driver.id)
-                
-                driver_data = {
-                    "code": driver.code,
-                    "name": driver.full_name,
-                    "team": driver_result.team.short_name if driver_result else "Unknown",
-                    "final_position": driver_result.position if driver_result else None,
-                    "grid_position": driver_result.grid_position if driver_result else None,
-                    "final_status": driver_result.final_status if driver_result else "Unknown",
-                    "stints": stints_data,
-                    "lap_statistics": lap_stats,
-                    "pit_stops": pit_stops
-                }
-                
-                context["drivers"].append(driver_data)
-                
-            except DriverNotFoundException:
+            driver = drivers_by_code.get(code.upper())
+            if not driver:
                 logger.warning(f"Driver {code} not found in race {race_id}")
                 continue
+            
+            # Get driver's result
+            driver_result = results_by_driver_id.get(driver.id)
+            
+            # Get stints
+            stints_data = [
+                {
+                    "stint": s.stint_number,
+                    "compound": s.compound,
+                    "laps": f"{s.start_lap}-{s.end_lap}",
+                    "laps_count": s.laps_count,
+                    "avg_lap_time_sec": round(s.avg_lap_time_sec, 3)
+                }
+                for s in stints_by_driver_id.get(driver.id, [])
+            ]
+            
+            # Lap statistics and pit stop count
+            lap_summary = lap_summaries.get(driver.id, {})
+            
+            driver_data = {
+                "code": driver.code,
+                "name": driver.full_name,
+                "team": driver_result.team.short_name if driver_result else "Unknown",
+                "final_position": driver_result.position if driver_result else None,
+                "grid_position": driver_result.grid_position if driver_result else None,
+                "final_status": driver_result.final_status if driver_result else "Unknown",
+                "stints": stints_data,
+                "lap_statistics": lap_summary.get("lap_statistics", {
+                    "avg_lap_time": None,
+                    "min_lap_time": None,
+                    "max_lap_time": None,
+                    "total_laps": 0
+                }),
+                "pit_stops": lap_summary.get("pit_stops", 0)
+            }
+            
+            context["drivers"].append(driver_data)
     
     return context
 
 
+def build_prompt_prefix(context: dict) -> str:
+    """
+    Build the request-independent start of the user prompt for a context.
+    
+    The context is serialized with sorted keys so the same data always
+    yields the same prefix.
+    """
+    context_json = orjson.dumps(context, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode()
+    return (
+        f"Race Data Context (JSON):\n{context_json}\n\n"
+        "Based on the data above, please provide a concise analysis answering the question. "
+        "Reference specific numbers from the data to support your explanation.\n\n"
+    )
+
+
+def normalize_question(question: str) -> str:
+    """Reduce a question to lowercase words so trivially different phrasings share a cache entry."""
+    return " ".join(re.findall(r"\w+", question.lower()))
+
+
 async def answer_race_question(
-    db: Session,
+    db: AsyncSession,
     race_id: int,
     question: str,
     driver_codes: list[str] | None,
@@ -156,6 +187,10 @@ async def answer_race_question(
     """
     Answer a question about a race using LLM with race data context.
     
+    Answers are cached per race (and data version), driver set, focus, lap
+    range and normalized question, so repeated questions skip both the
+    database and the LLM.
+    
     Args:
         db: Database session
         race_id: Race ID
@@ -175,42 +210,54 @@ async def answer_race_question(
     """
     logger.info(f"Answering question for race {race_id}: {question[:100]}...")
     
-    # Get race and session
-    race = f1_queries.get_race_by_id(db, race_id)
-    session = f1_queries.get_race_main_session(db, race_id)
-    
     # Clean driver codes
     driver_codes = driver_codes or []
     driver_codes = [code.upper() for code in driver_codes[:2]]  # Max 2 drivers
     
-    # Build context
-    context = build_context_dict(
-        db, 
-        race_id, 
-        session.id, 
-        driver_codes, 
-        lap_range
-    )
+    # Key the caches by the race's data version too: ingestion runs in another
+    # process, so its clear_caches() never reaches the API workers, but a
+    # re-ingested race gets a new ETag (within race_etags' 30 s TTL)
+    version = await get_race_etag(db, race_id)
+    if version is None:
+        # Raises RaceNotFoundException
+        await f1_queries.get_race_by_id(db, race_id)
     
-    # Serialize context to JSON string
-    context_json = json.dumps(context, indent=2)
+    cache_key = (race_id, version, tuple(sorted(driver_codes)), focus, lap_range, normalize_question(question))
+    cached = chat_answers.get(cache_key)
+    if cached is not None:
+        logger.info(f"Answer cache hit for race {race_id}")
+        return cached
     
-    # Build user prompt
-    user_prompt = f"""Question: {question}
-
-Focus: {focus.value}
-
-Race Data Context (JSON):
-{context_json}
-
-Based on the data above, please provide a concise analysis answering the question. Reference specific numbers from the data to support your explanation."""
+    # The context block depends only on the race, drivers and lap range, so it
+    # is built and serialized once and shared by every question about them
+    context_key = (race_id, version, tuple(driver_codes), lap_range)
+    cached_context = chat_contexts.get(context_key)
+    if cached_context is None:
+        # Get race session
+        session_id = await get_race_main_session_id(db, race_id)
+        
+        # Build context
+        context = await build_context_dict(
+            db, 
+            race_id, 
+            session_id, 
+            driver_codes, 
+            lap_range
+        )
+        
+        # Serialize context deterministically so the prompt prefix is identical;
+        # large contexts are real CPU work, so keep it off the event loop
+        prompt_prefix = await run_in_threadpool(build_prompt_prefix, context)
+        cached_context = chat_contexts[context_key] = (context, prompt_prefix)
+    context, prompt_prefix = cached_context
     
-    # Get system prompt
-    system_prompt = build_system_prompt()
+    # Static instructions and the race context come first (cached above), the
+    # per-request focus and question last
+    user_prompt = f"{prompt_prefix}Focus: {focus.value}\n\nQuestion: {question}"
     
     # Call LLM
     logger.debug("Calling LLM...")
-    answer = await llm_client.ask(system_prompt, user_prompt)
+    answer = await llm_client.ask(SYSTEM_PROMPT, user_prompt)
     logger.info(f"Received LLM response: {len(answer)} characters")
     
     # Build response
@@ -230,7 +277,8 @@ Based on the data above, please provide a concise analysis answering the questio
         short_stats=short_stats
     )
     
-    return ChatResponse(
+    response = chat_answers[cache_key] = ChatResponse(
         answer=answer,
         used_context=used_context
-    )
\ No newline at end of file
+    )
+    return response
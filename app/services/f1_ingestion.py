@@ -1,167 +1,217 @@
 """
-Replay service for WebSocket telemetry streaming.
+F1 data ingestion service: loads a race from FastF1 into PostgreSQL.
+
+Usage:
+    python -m app.services.f1_ingestion --year 2024 --round 1
 """
-import asyncio
-from typing import AsyncGenerator
+import argparse
+import multiprocessing
+import os
+from datetime import datetime
+from itertools import repeat
+
+import fastf1
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
-from app.services import f1_queries
-from app.models.telemetry import TelemetryFrame
-from app.schemas.telemetry import ReplayFrameSchema, CarPositionSchema
-from app.core.logging import get_logger
+
+from app.config import get_settings
+from app.core.logging import get_logger, setup_logging
+from app.db import SessionLocal, bulk_copy_telemetry, merge_laps, merge_stints
+from app.models.f1 import Season, Race, Session as SessionModel, Team, Driver, DriverSessionResult
+from app.models.telemetry import TelemetryFrame, TrackShapePoint, TYRE_COMPOUNDS
+from app.services.f1_queries_cache import clear_caches
 
 logger = get_logger(__name__)
 
 
-def group_frames_by_driver(frames: list[TelemetryFrame]) -> dict[int, TelemetryFrame]:
-    """
-    Group telemetry frames by driver ID, keeping the latest frame for each driver.
-    
-    Args:
-        frames: List of telemetry frames
-        
-    Returns:
-        Dictionary mapping driver_id to latest TelemetryFrame
-    """
-    driver_frames: dict[int, TelemetryFrame] = {}
-    for frame in frames:
-        driver_frames[frame.driver_id] = frame
-    return driver_frames
+"""
+F1 data ingestion service - Part 1: Race Metadata and Results
+"""
 
+def _optional(value, cast: type = float):
+    """Convert a scalar from a FastF1 frame, with NaN/NaT/'' (or unparsable) as None."""
+    if value is None or value == '' or pd.isna(value):
+        return None
+    try:
+        return cast(float(value)) if cast is int else cast(value)
+    except (TypeError, ValueError):
+        return None
 
-def build_replay_frame(current_time: float, frames: list[TelemetryFrame]) -> ReplayFrameSchema:
-    """
-    Build a replay frame from telemetry data.
-    
-    Args:
-        current_time: Current replay time in seconds
-        frames: Telemetry frames for this time window
-        
-    Returns:
-        ReplayFrameSchema with car positions
-    """
-    # Group by driver to get latest position for each
-    driver_frames = group_frames_by_driver(frames)
-    
-    # Build car positions
-    cars = []
-    for driver_id, frame in driver_frames.items():
-        cars.append(
-            CarPositionSchema(
-                driver_code=frame.driver.code,
-                x=frame.x_norm,
-                y=frame.y_norm,
-                speed_kph=frame.speed_kph,
-                lap=frame.lap_number
-            )
-        )
-    
-    return ReplayFrameSchema(t=current_time, cars=cars)
+
+def _format_race_time(time: pd.Timedelta) -> str:
+    """Format a total race time as H:MM:SS.mmm."""
+    total_ms = int(round(time.total_seconds() * 1000))
+    hours, rest = divmod(total_ms, 3_600_000)
+    minutes, rest = divmod(rest, 60_000)
+    seconds, ms = divmod(rest, 1000)
+    return f"{hours}:{minutes:02d}:{seconds:02d}.{ms:03d}"
 
 
-async def generate_replay_frames(
+def ingest_race_metadata(
     db: Session,
-    session_id: int,
-    fps: int = 10,
-    driver_ids: list[int] | None = None
-) -> AsyncGenerator[ReplayFrameSchema, None]:
+    ff1_session: fastf1.core.Session
+) -> tuple[Season, Race, SessionModel]:
     """
-    Generate replay frames for a session as an async generator.
+    Create or update the season, race and race session of a FastF1 session.
     
     Args:
         db: Database session
-        session_id: Session ID to replay
-        fps: Frames per second for replay
-        driver_ids: Optional list of driver IDs to include (None = all drivers)
+        ff1_session: Loaded FastF1 session object
         
-    Yields:
-        ReplayFrameSchema objects at the specified FPS
+    Returns:
+        (season, race, session) models; new ones are added but not flushed
     """
-    logger.info(f"Starting replay for session {session_id} at {fps} FPS")
-    
-    # Load all telemetry frames
-    telemetry_frames = f1_queries.get_telemetry_frames(db, session_id, driver_ids)
-    
-    if not telemetry_frames:
-        logger.warning(f"No telemetry frames found for session {session_id}")
-        return
-    
-    logger.info(f"Loaded {len(telemetry_frames)} telemetry frames")
+    event = ff1_session.event
+    event_date = pd.Timestamp(event['EventDate'])
+    year = int(event_date.year)
+    round_num = int(event['RoundNumber'])
+    
+    season = db.scalar(select(Season).where(Season.year == year))
+    if season is None:
+        season = Season(year=year)
+        db.add(season)
+    
+    race = None
+    if season.id is not None:
+        race = db.scalar(select(Race).where(Race.season_id == season.id, Race.round == round_num))
+    if race is None:
+        race = Race(season=season, round=round_num)
+        db.add(race)
     
-    # Get time range
-    min_time = min(frame.t_rel_sec for frame in telemetry_frames)
-    max_time = max(frame.t_rel_sec for frame in telemetry_frames)
-    
-    logger.info(f"Time range: {min_time:.2f}s to {max_time:.2f}s")
-    
-    # Calculate time step
-    time_step = 1.0 / fps
-    current_time = min_time
-    frame_index = 0
+    laps_df = ff1_session.laps
+    race.name = str(event['EventName'])
+    race.circuit_name = str(event['Location'])
+    race.country = str(event['Country'])
+    race.date = event_date.to_pydatetime()
+    race.total_laps = (
+        _optional(laps_df['LapNumber'].max(), int) if laps_df is not None and not laps_df.empty else None
+    )
     
-    # Pre-sort frames by time for efficient iteration
-    telemetry_frames.sort(key=lambda f: f.t_rel_sec)
+    session = None
+    if race.id is not None:
+        session = db.scalar(
+            select(SessionModel).where(SessionModel.race_id == race.id, SessionModel.session_type == "RACE")
+        )
+    if session is None:
+        session = SessionModel(race=race, session_type="RACE")
+        db.add(session)
     
-    while current_time <= max_time:
-        # Collect frames within current time window
-        window_frames = []
-        window_end = current_time + time_step
-        
-        # Advance frame_index to current window
-        while frame_index < len(telemetry_frames):
-            frame = telemetry_frames[frame_index]
-            if frame.t_rel_sec > window_end:
-                break
-            if frame.t_rel_sec >= current_time:
-                window_frames.append(frame)
-            frame_index += 1
-        
-        # Yield frame if we have data
-        if window_frames:
-            replay_frame = build_replay_frame(current_time, window_frames)
-            yield replay_frame
-        
-        # Advance time and sleep
-        current_time += time_step
-        await asyncio.sleep(time_step)
-        
-        # Reset frame_index if needed (for overlapping windows)
-        # In practice, we want to scan forward, so we keep advancing
-        # But we might miss frames if they span multiple windows
-        # For simplicity, we'll rely on grouping within each window
+    session.fastf1_identifier = f"{year}_{round_num}_R"
+    session_date = getattr(ff1_session, 'date', None)
+    session.start_time = None if session_date is None or pd.isna(session_date) else pd.Timestamp(session_date).to_pydatetime()
     
-    logger.info(f"Replay completed for session {session_id}")
+    return season, race, session
 
 
-async def replay_session_websocket(
+def ingest_results(
     db: Session,
-    session_id: int,
-    fps: int,
-    send_callback: callable
+    session: SessionModel,
+    ff1_session: fastf1.core.Session
 ) -> None:
     """
-    Run replay and send frames via WebSocket callback.
+    Ingest the session classification, creating missing drivers and teams.
+    
+    Results are updated in place per driver; results of drivers no longer
+    in the classification are deleted.
     
     Args:
         db: Database session
-        session_id: Session ID to replay
-        fps: Frames per second
-        send_callback: Async function to send data (e.g., websocket.send_json)
+        session: Session model (flushed, so it has an ID)
+        ff1_session: FastF1 session object
     """
-    try:
-        async for frame in generate_replay_frames(db, session_id, fps):
-            await send_callback(frame.model_dump())
-    except Exception as e:
-        logger.error(f"Error during replay: {str(e)}")
-        raise
+    results_df = ff1_session.results
+    
+    if results_df is None or results_df.empty:
+        logger.warning("No results data available")
+        return
+    
+    logger.info(f"Ingesting {len(results_df)} results...")
+    
+    results_df = results_df[results_df['Abbreviation'].notna()]
+    codes = results_df['Abbreviation'].astype(str).tolist()
+    team_names = results_df['TeamName'].astype(str).tolist()
+    
+    # One query per table instead of one per driver
+    drivers = {d.code: d for d in db.scalars(select(Driver).where(Driver.code.in_(codes)))}
+    teams = {t.name: t for t in db.scalars(select(Team).where(Team.name.in_(team_names)))}
+    existing = {
+        r.driver_id: r
+        for r in db.scalars(select(DriverSessionResult).where(DriverSessionResult.session_id == session.id))
+    }
+    
+    # Race results give the winner's total time and everyone else's gap to it
+    winner = results_df[results_df['Position'] == 1]
+    winner_time = winner['Time'].iloc[0] if not winner.empty else pd.NaT
+    
+    seen_driver_ids = set()
+    for row, code, team_name in zip(results_df.itertuples(index=False), codes, team_names):
+        driver = drivers.get(code)
+        if driver is None:
+            driver = drivers[code] = Driver(code=code)
+            db.add(driver)
+        driver.full_name = str(row.FullName)
+        driver.country = _optional(row.CountryCode, str)
+        driver.permanent_number = _optional(row.DriverNumber, int)
+        
+        team = teams.get(team_name)
+        if team is None:
+            team = teams[team_name] = Team(name=team_name, short_name=team_name[:50])
+            db.add(team)
+        color = _optional(row.TeamColor, str)
+        if color and len(color) == 6:
+            team.color_hex = f"#{color}"
+        
+        result = existing.get(driver.id) if driver.id is not None else None
+        if result is None:
+            result = DriverSessionResult(session_id=session.id, driver=driver)
+            db.add(result)
+        seen_driver_ids.add(driver.id)
+        
+        position = _optional(row.Position, int)
+        time = row.Time
+        if position == 1 and pd.notna(time):
+            total_race_time_sec = time.total_seconds()
+            time_text = _format_race_time(time)
+            gap_to_winner_text = None
+        elif pd.notna(time) and pd.notna(winner_time):
+            total_race_time_sec = (winner_time + time).total_seconds()
+            time_text = gap_to_winner_text = f"+{time.total_seconds():.3f}s"
+        else:
+            total_race_time_sec = time_text = gap_to_winner_text = None
+        
+        result.team = team
+        result.position = position
+        result.grid_position = _optional(row.GridPosition, int)
+        result.points = _optional(row.Points)
+        result.final_status = str(row.Status)
+        result.total_race_time_sec = total_race_time_sec
+        result.time_text = time_text
+        result.gap_to_winner_text = gap_to_winner_text
+    
+    # Drop results of drivers no longer classified in this session
+    for driver_id, result in existing.items():
+        if driver_id not in seen_driver_ids:
+            db.delete(result)
+    
+    logger.info(f"Results ingestion complete ({len(codes)} drivers)")
+
 
 """
 F1 data ingestion service - Part 2: Laps, Stints, Telemetry, Track Shape
 """
 
+def get_driver_ids_by_code(db: Session) -> dict[str, int]:
+    """Map driver code to driver ID (one query instead of one per lap/driver)."""
+    return dict(db.execute(select(Driver.code, Driver.id)).all())
+
+
 def ingest_laps(
     db: Session,
     session: SessionModel,
-    ff1_session: fastf1.core.Session
+    ff1_session: fastf1.core.Session,
+    driver_ids: dict[str, int] | None = None
 ) -> None:
     """
     Ingest lap data.
@@ -170,6 +220,7 @@ def ingest_laps(
         db: Database session
         session: Session model
         ff1_session: FastF1 session object
+        driver_ids: Driver code -> ID map (default: looked up with get_driver_ids_by_code)
     """
     laps_df = ff1_session.laps
     
@@ -179,86 +230,58 @@ def ingest_laps(
     
     logger.info(f"Ingesting {len(laps_df)} laps...")
     
-    # Delete existing laps for this session
-    db.query(Lap).filter(Lap.session_id == session.id).delete()
-    
-    for idx, lap_row in laps_df.iterrows():
-        # Get driver
-        driver_code = str(lap_row.get('Driver', 'UNK'))
-        stmt = select(Driver).where(Driver.code == driver_code)
-        driver = db.execute(stmt).scalar_one_or_none()
-        
-        if not driver:
-            logger.warning(f"Driver {driver_code} not found for lap, skipping")
-            continue
-        
-        # Parse lap number
-        lap_number = int(lap_row.get('LapNumber', 0))
-        
-        # Parse lap time
-        lap_time_sec = None
-        if pd.notna(lap_row.get('LapTime')):
-            try:
-                lap_time_sec = lap_row['LapTime'].total_seconds()
-            except:
-                pass
-        
-        # Parse sector times
-        sector1 = None
-        sector2 = None
-        sector3 = None
-        
-        if pd.notna(lap_row.get('Sector1Time')):
-            try:
-                sector1 = lap_row['Sector1Time'].total_seconds()
-            except:
-                pass
-        
-        if pd.notna(lap_row.get('Sector2Time')):
-            try:
-                sector2 = lap_row['Sector2Time'].total_seconds()
-            except:
-                pass
-        
-        if pd.notna(lap_row.get('Sector3Time')):
-            try:
-                sector3 = lap_row['Sector3Time'].total_seconds()
-            except:
-                pass
-        
-        # Parse pit lap
-        is_pit = bool(lap_row.get('PitInTime') is not pd.NaT or lap_row.get('PitOutTime') is not pd.NaT)
-        
-        # Tyre info
-        compound = str(lap_row.get('Compound', '')) if pd.notna(lap_row.get('Compound')) else None
-        tyre_life = int(lap_row.get('TyreLife', 0)) if pd.notna(lap_row.get('TyreLife')) else None
-        
-        # Track status
-        track_status = str(lap_row.get('TrackStatus', '')) if pd.notna(lap_row.get('TrackStatus')) else None
-        
-        lap = Lap(
-            session_id=session.id,
-            driver_id=driver.id,
-            lap_number=lap_number,
-            lap_time_sec=lap_time_sec,
-            sector1_time_sec=sector1,
-            sector2_time_sec=sector2,
-            sector3_time_sec=sector3,
-            is_pit_lap=is_pit,
-            tyre_compound=compound,
-            tyre_life_laps=tyre_life,
-            track_status=track_status
-        )
-        db.add(lap)
-    
-    db.flush()
-    logger.info("Laps ingestion complete")
+    # Parse whole columns at once instead of row by row
+    if driver_ids is None:
+        driver_ids = get_driver_ids_by_code(db)
+    lap_driver_ids = laps_df['Driver'].astype(str).map(driver_ids)
+    unknown = lap_driver_ids.isna()
+    if unknown.any():
+        missing = sorted(laps_df.loc[unknown, 'Driver'].astype(str).unique())
+        logger.warning(f"Drivers {missing} not found, skipping {int(unknown.sum())} laps")
+        laps_df = laps_df[~unknown]
+        lap_driver_ids = lap_driver_ids[~unknown]
+    
+    def seconds(column: str) -> list:
+        """Timedelta column as seconds, NaT -> None."""
+        return _nullable(laps_df[column].dt.total_seconds().to_numpy(dtype=float))
+    
+    def nullable_text(values: pd.Series, present: pd.Series) -> list:
+        """Object column with None wherever `present` is False."""
+        return values.astype(object).where(present, None).tolist()
+    
+    # Pit lap if the car entered or left the pits on it
+    is_pit = laps_df['PitInTime'].notna() | laps_df['PitOutTime'].notna()
+    
+    # Tyre info
+    compound = laps_df['Compound'].astype(str).str.upper()
+    compound = compound.where(compound.isin(TYRE_COMPOUNDS), 'UNKNOWN')
+    
+    n = len(laps_df)
+    rows = list(zip(
+        repeat(session.id, n),
+        lap_driver_ids.astype(int).tolist(),
+        laps_df['LapNumber'].fillna(0).astype(int).tolist(),
+        seconds('LapTime'),
+        seconds('Sector1Time'),
+        seconds('Sector2Time'),
+        seconds('Sector3Time'),
+        is_pit.tolist(),
+        nullable_text(compound, laps_df['Compound'].notna() & (laps_df['Compound'].astype(str) != '')),
+        _nullable(laps_df['TyreLife'].to_numpy(dtype=float), int),
+        # Track status: "1" (green), "2" (yellow), etc.
+        nullable_text(laps_df['TrackStatus'].astype(str), laps_df['TrackStatus'].notna())
+    ))
+    
+    # Merge in place of the session's existing laps
+    merged = merge_laps(db, session.id, rows)
+    logger.info(f"Laps ingestion complete ({merged} laps)")
 
 
 def derive_stints(
     db: Session,
     session: SessionModel,
-    ff1_session: fastf1.core.Session
+    ff1_session: fastf1.core.Session,
+    driver_ids: dict[str, int] | None = None
 ) -> None:
     """
     Derive and ingest stint data from laps.
@@ -267,94 +290,184 @@ def derive_stints(
         db: Database session
         session: Session model
         ff1_session: FastF1 session object
+        driver_ids: Driver code -> ID map (default: looked up with get_driver_ids_by_code)
     """
     logger.info("Deriving stints from laps...")
     
-    # Delete existing stints
-    db.query(Stint).filter(Stint.session_id == session.id).delete()
-    
     laps_df = ff1_session.laps
     if laps_df is None or laps_df.empty:
         return
     
-    # Group by driver
-    for driver_code in laps_df['Driver'].unique():
-        driver_laps = laps_df[laps_df['Driver'] == driver_code].copy()
-        driver_laps = driver_laps.sort_values('LapNumber')
-        
-        # Get driver
-        stmt = select(Driver).where(Driver.code == driver_code)
-        driver = db.execute(stmt).scalar_one_or_none()
-        if not driver:
-            continue
-        
-        # Identify stint changes (compound changes)
-        current_compound = None
-        stint_number = 0
-        stint_laps = []
-        
-        for idx, lap_row in driver_laps.iterrows():
-            compound = str(lap_row.get('Compound', ''))
-            lap_num = int(lap_row.get('LapNumber', 0))
-            lap_time = lap_row.get('LapTime')
-            
-            # Skip if no compound or pit lap
-            if pd.isna(compound) or compound == '' or compound == 'nan':
-                continue
-            
-            # New stint detected
-            if compound != current_compound:
-                # Save previous stint
-                if stint_laps:
-                    valid_times = [t for t in stint_laps if pd.notna(t)]
-                    if valid_times:
-                        avg_time = sum(t.total_seconds() for t in valid_times) / len(valid_times)
-                        stint = Stint(
-                            session_id=session.id,
-                            driver_id=driver.id,
-                            stint_number=stint_number,
-                            start_lap=stint_laps[0][0],
-                            end_lap=stint_laps[-1][0],
-                            compound=current_compound,
-                            avg_lap_time_sec=avg_time,
-                            laps_count=len(stint_laps)
-                        )
-                        db.add(stint)
-                
-                # Start new stint
-                stint_number += 1
-                current_compound = compound
-                stint_laps = []
-            
-            stint_laps.append((lap_num, lap_time))
-        
-        # Save last stint
-        if stint_laps and current_compound:
-            valid_times = [t for t in [lt[1] for lt in stint_laps] if pd.notna(t)]
-            if valid_times:
-                avg_time = sum(t.total_seconds() for t in valid_times) / len(valid_times)
-                stint = Stint(
-                    session_id=session.id,
-                    driver_id=driver.id,
-                    stint_number=stint_number,
-                    start_lap=stint_laps[0][0],
-                    end_lap=stint_laps[-1][0],
-                    compound=current_compound,
-                    avg_lap_time_sec=avg_time,
-                    laps_count=len(stint_laps)
-                )
-                db.add(stint)
-    
-    db.flush()
-    logger.info("Stints derivation complete")
+    # Laps without a compound are not part of any stint
+    laps = laps_df[['Driver', 'LapNumber', 'Compound', 'LapTime']]
+    compound = laps['Compound'].astype(str)
+    laps = laps[laps['Compound'].notna() & (compound != '') & (compound != 'nan')].copy()
+    laps['Compound'] = laps['Compound'].astype(str).str.upper()
+    laps['LapTimeSec'] = laps['LapTime'].dt.total_seconds()
+    laps = laps.sort_values(['Driver', 'LapNumber'], kind='stable')
+    
+    # A stint is a run of consecutive laps on the same compound: number them
+    # per driver by counting compound changes. Compare FastF1's values before
+    # mapping unlisted ones to UNKNOWN, so two different unlisted compounds in
+    # a row still make two stints.
+    new_stint = laps['Compound'] != laps.groupby('Driver')['Compound'].shift()
+    laps['stint_number'] = new_stint.groupby(laps['Driver']).cumsum()
+    laps.loc[~laps['Compound'].isin(TYRE_COMPOUNDS), 'Compound'] = 'UNKNOWN'
+    
+    stints = laps.groupby(['Driver', 'stint_number'], sort=False).agg(
+        start_lap=('LapNumber', 'first'),
+        end_lap=('LapNumber', 'last'),
+        compound=('Compound', 'first'),
+        avg_lap_time_sec=('LapTimeSec', 'mean'),
+        laps_count=('LapNumber', 'size'),
+    ).reset_index()
+    
+    # Stints need at least one timed lap and a known driver
+    if driver_ids is None:
+        driver_ids = get_driver_ids_by_code(db)
+    stints['driver_id'] = stints['Driver'].astype(str).map(driver_ids)
+    stints = stints[stints['avg_lap_time_sec'].notna() & stints['driver_id'].notna()]
+    
+    # Collect stint rows for one merge
+    rows = list(zip(
+        repeat(session.id, len(stints)),
+        stints['driver_id'].astype(int).tolist(),
+        stints['stint_number'].astype(int).tolist(),
+        stints['start_lap'].astype(int).tolist(),
+        stints['end_lap'].astype(int).tolist(),
+        stints['compound'].tolist(),
+        stints['avg_lap_time_sec'].astype(float).tolist(),
+        stints['laps_count'].astype(int).tolist()
+    ))
+    
+    # Merge in place of the session's existing stints
+    merged = merge_stints(db, session.id, rows)
+    logger.info(f"Stints derivation complete ({merged} stints)")
+
+
+def _channel(telemetry: pd.DataFrame, name: str, default: float = np.nan) -> np.ndarray:
+    """Get a telemetry channel as a float array (all `default` if the channel is missing)."""
+    if name not in telemetry:
+        return np.full(len(telemetry), default)
+    return telemetry[name].to_numpy(dtype=float)
+
+
+def _nullable(values: np.ndarray, cast: type = float) -> list:
+    """Convert a float array to Python values, with NaN as None (NULL in COPY)."""
+    out = np.full(len(values), None, dtype=object)
+    present = ~np.isnan(values)
+    out[present] = values[present].astype(cast).tolist()
+    return out.tolist()
+
+
+# Telemetry channels kept by load_driver_telemetry (the ones ingest_telemetry
+# and ingest_track_shape read)
+TELEMETRY_COLUMNS = ("X", "Y", "Speed", "Throttle", "Brake", "nGear", "LapNumber", "Time")
+
+# Laps of the session being loaded, inherited by forked telemetry workers so
+# the FastF1 session never has to be pickled
+_worker_laps = None
+
+
+def _load_lap_telemetry(laps_df: pd.DataFrame, driver_code: str) -> pd.DataFrame | None:
+    """Load one driver's telemetry for load_driver_telemetry (None if unavailable)."""
+    driver_laps = laps_df[laps_df['Driver'] == driver_code].dropna(subset=['LapStartTime', 'Time'])
+    driver_laps = driver_laps.sort_values('LapStartTime')
+    if driver_laps.empty:
+        return None
+    try:
+        telemetry = driver_laps.get_telemetry()
+    except Exception as e:
+        logger.warning(f"No telemetry for {driver_code}: {e}")
+        return None
+    if telemetry is None or telemetry.empty:
+        return None
+    
+    # Assign each sample to the lap it falls in
+    session_time = telemetry['SessionTime'].to_numpy()
+    lap_starts = driver_laps['LapStartTime'].to_numpy()
+    lap_ends = driver_laps['Time'].to_numpy()
+    lap_idx = np.searchsorted(lap_starts, session_time, side='right') - 1
+    in_lap = lap_idx >= 0
+    in_lap[in_lap] = session_time[in_lap] <= lap_ends[lap_idx[in_lap]]
+    
+    telemetry = telemetry[in_lap].copy()
+    lap_idx = lap_idx[in_lap]
+    telemetry['LapNumber'] = driver_laps['LapNumber'].fillna(0).to_numpy(dtype=int)[lap_idx]
+    telemetry['Time'] = telemetry['SessionTime'] - lap_starts[lap_idx]
+    
+    # A plain DataFrame of the channels used downstream: FastF1's Telemetry
+    # carries the whole Session in its pickled _metadata, which would be
+    # sent back from every worker
+    return pd.DataFrame({
+        column: telemetry[column].to_numpy()
+        for column in TELEMETRY_COLUMNS
+        if column in telemetry
+    })
+
+
+def _load_lap_telemetry_worker(driver_code: str) -> pd.DataFrame | None:
+    """Pool entry point: load a driver's telemetry from the inherited laps."""
+    return _load_lap_telemetry(_worker_laps, driver_code)
+
+
+def load_driver_telemetry(
+    ff1_session: fastf1.core.Session,
+    workers: int | None = None
+) -> dict[str, pd.DataFrame]:
+    """
+    Load each driver's merged car/position telemetry for the whole race.
+    
+    FastF1 re-slices, merges and resamples the channels on every
+    get_telemetry() call, so this is done once per driver (instead of once
+    per lap per consumer) and shared by ingest_telemetry and
+    ingest_track_shape. Drivers are independent, so they are loaded in
+    parallel by forked worker processes, which inherit the loaded session
+    instead of receiving a pickled copy.
+    
+    Args:
+        ff1_session: Loaded FastF1 session object
+        workers: Worker processes (default: one per CPU; 1 loads serially)
+    
+    Returns:
+        Driver code -> plain DataFrame of TELEMETRY_COLUMNS, with LapNumber
+        added and Time relative to the start of that lap (as
+        Lap.get_telemetry() gives). Samples outside any timed lap are dropped.
+    """
+    global _worker_laps
+    
+    laps_df = ff1_session.laps
+    if laps_df is None or laps_df.empty:
+        return {}
+    
+    driver_codes = list(laps_df['Driver'].unique())
+    workers = min(workers or os.cpu_count() or 1, len(driver_codes))
+    
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        logger.info(f"Loading telemetry for {len(driver_codes)} drivers with {workers} workers")
+        _worker_laps = laps_df
+        try:
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                telemetry = pool.map(_load_lap_telemetry_worker, driver_codes)
+        finally:
+            _worker_laps = None
+    else:
+        telemetry = [_load_lap_telemetry(laps_df, driver_code) for driver_code in driver_codes]
+    
+    return {
+        driver_code: driver_telemetry
+        for driver_code, driver_telemetry in zip(driver_codes, telemetry)
+        if driver_telemetry is not None
+    }
 
 
 def ingest_telemetry(
     db: Session,
     session: SessionModel,
     race: Race,
-    ff1_session: fastf1.core.Session,
-    sample_rate: int = 10
+    telemetry_by_driver: dict[str, pd.DataFrame],
+    sample_rate: int = 10,
+    driver_ids: dict[str, int] | None = None
 ) -> None:
     """
     Ingest telemetry data (positions, speed, etc.).
@@ -364,104 +477,83 @@ def ingest_telemetry(
         db: Database session
         session: Session model
         race: Race model
-        ff1_session: FastF1 session object
-        sample_rate: Keep every Nth telemetry point
+        telemetry_by_driver: Per-driver telemetry from load_driver_telemetry
+        sample_rate: Keep every Nth telemetry point of each lap
+        driver_ids: Driver code -> ID map (default: looked up with get_driver_ids_by_code)
     """
     logger.info(f"Ingesting telemetry (sample rate: 1/{sample_rate})...")
     
-    # Delete existing telemetry for this session
+    # Delete existing telemetry for this session. Frames have no natural
+    # unique key to merge on (t_rel_sec restarts every lap), and a ranged
+    # delete on the session's partition is cheap next to the COPY.
     db.query(TelemetryFrame).filter(TelemetryFrame.session_id == session.id).delete()
     
-    # Collect all telemetry data
-    all_x = []
-    all_y = []
-    
-    laps_df = ff1_session.laps
-    if laps_df is None or laps_df.empty:
-        logger.warning("No laps for telemetry")
+    if not telemetry_by_driver:
+        logger.warning("No telemetry data available")
         return
     
-    # First pass: collect all coordinates for normalization
-    for driver_code in laps_df['Driver'].unique():
-        driver_laps = laps_df[laps_df['Driver'] == driver_code]
-        for idx, lap in driver_laps.iterrows():
-            try:
-                telemetry = lap.get_telemetry()
-                if telemetry is not None and not telemetry.empty:
-                    all_x.extend(telemetry['X'].values)
-                    all_y.extend(telemetry['Y'].values)
-            except:
-                continue
-    
-    if not all_x or not all_y:
+    if driver_ids is None:
+        driver_ids = get_driver_ids_by_code(db)
+    
+    # Coordinate range for normalization, over every driver's positions
+    ranges = pd.concat(
+        [telemetry[['X', 'Y']] for telemetry in telemetry_by_driver.values()]
+    ).agg(['min', 'max'])
+    x_min, x_max = float(ranges.at['min', 'X']), float(ranges.at['max', 'X'])
+    y_min, y_max = float(ranges.at['min', 'Y']), float(ranges.at['max', 'Y'])
+    
+    if not np.isfinite([x_min, x_max, y_min, y_max]).all():
         logger.warning("No telemetry data available")
         return
     
-    # Normalize coordinates
-    all_x = np.array(all_x)
-    all_y = np.array(all_y)
-    x_min, x_max = all_x.min(), all_x.max()
-    y_min, y_max = all_y.min(), all_y.max()
-    
     logger.info(f"Coordinate ranges: X[{x_min:.2f}, {x_max:.2f}], Y[{y_min:.2f}, {y_max:.2f}]")
     
-    # Second pass: ingest sampled telemetry
-    for driver_code in laps_df['Driver'].unique():
-        # Get driver
-        stmt = select(Driver).where(Driver.code == driver_code)
-        driver = db.execute(stmt).scalar_one_or_none()
-        if not driver:
+    # Normalize and convert whole columns per driver, then collect the rows
+    # for one bulk COPY
+    rows = []
+    for driver_code, telemetry in telemetry_by_driver.items():
+        driver_id = driver_ids.get(driver_code)
+        if driver_id is None:
             continue
-        
-        driver_laps = laps_df[laps_df['Driver'] == driver_code]
-        
-        for idx, lap in driver_laps.iterrows():
-            lap_number = int(lap.get('LapNumber', 0))
+        try:
+            # Sample every Nth point of each lap
+            telemetry = telemetry[telemetry.groupby('LapNumber').cumcount() % sample_rate == 0]
+            n = len(telemetry)
+            
+            # Normalize coordinates
+            x = telemetry['X'].to_numpy(dtype=float)
+            y = telemetry['Y'].to_numpy(dtype=float)
+            x_norm = (x - x_min) / (x_max - x_min) if x_max > x_min else np.full(n, 0.5)
+            y_norm = (y - y_min) / (y_max - y_min) if y_max > y_min else np.full(n, 0.5)
+            
+            # Time relative to lap start
+            t_rel = telemetry['Time'].dt.total_seconds().fillna(0.0).to_numpy()
+            
+            # Other channels (NaN -> NULL)
+            speed = _nullable(_channel(telemetry, 'Speed'))
+            throttle = _nullable(_channel(telemetry, 'Throttle') / 100.0)
+            brake = (_channel(telemetry, 'Brake', 0.0) != 0).astype(float)
+            gear = _nullable(_channel(telemetry, 'nGear'), int)
             
-            try:
-                telemetry = lap.get_telemetry()
-                if telemetry is None or telemetry.empty:
-                    continue
-                
-                # Sample telemetry
-                telemetry = telemetry.iloc[::sample_rate]
-                
-                for t_idx, t_row in telemetry.iterrows():
-                    # Normalize coordinates
-                    x = float(t_row.get('X', 0))
-                    y = float(t_row.get('Y', 0))
-                    x_norm = (x - x_min) / (x_max - x_min) if x_max > x_min else 0.5
-                    y_norm = (y - y_min) / (y_max - y_min) if y_max > y_min else 0.5
-                    
-                    # Time relative to session start
-                    t_rel = float(t_row.get('Time', 0).total_seconds()) if pd.notna(t_row.get('Time')) else 0.0
-                    
-                    # Other channels
-                    speed = float(t_row.get('Speed', 0)) if pd.notna(t_row.get('Speed')) else None
-                    throttle = float(t_row.get('Throttle', 0)) / 100.0 if pd.notna(t_row.get('Throttle')) else None
-                    brake = 1.0 if t_row.get('Brake', False) else 0.0
-                    gear = int(t_row.get('nGear', 0)) if pd.notna(t_row.get('nGear')) else None
-                    
-                    frame = TelemetryFrame(
-                        session_id=session.id,
-                        driver_id=driver.id,
-                        t_rel_sec=t_rel,
-                        lap_number=lap_number,
-                        x_norm=x_norm,
-                        y_norm=y_norm,
-                        speed_kph=speed,
-                        throttle=throttle,
-                        brake=brake,
-                        gear=gear
-                    )
-                    db.add(frame)
-                
-            except Exception as e:
-                logger.warning(f"Error processing telemetry for {driver_code} lap {lap_number}: {e}")
-                continue
-    
-    db.flush()
-    logger.info("Telemetry ingestion complete")
+            rows.extend(zip(
+                repeat(session.id, n),
+                repeat(driver_id, n),
+                t_rel.tolist(),
+                telemetry['LapNumber'].tolist(),
+                x_norm.tolist(),
+                y_norm.tolist(),
+                speed,
+                throttle,
+                brake.tolist(),
+                gear
+            ))
+            
+        except Exception as e:
+            logger.warning(f"Error processing telemetry for {driver_code}: {e}")
+            continue
+    
+    copied = bulk_copy_telemetry(db, rows)
+    logger.info(f"Telemetry ingestion complete ({copied} frames)")
 
 
 # Continue in Part 3 for track shape and main function...
@@ -470,10 +562,23 @@ def ingest_telemetry(
 F1 data ingestion service - Part 3: Track Shape and Main Function
 """
 
+def _normalize_inplace(values: np.ndarray) -> np.ndarray:
+    """Scale a finite array to 0..1 in place (all 0.5 if it is constant)."""
+    low = values.min()
+    span = np.ptp(values)
+    if not span > 0:
+        values.fill(0.5)
+        return values
+    np.subtract(values, low, out=values)
+    values /= span
+    return values
+
+
 def ingest_track_shape(
     db: Session,
     race: Race,
     ff1_session: fastf1.core.Session,
+    telemetry_by_driver: dict[str, pd.DataFrame],
     decimate_factor: int = 20
 ) -> None:
     """
@@ -483,6 +588,7 @@ def ingest_track_shape(
         db: Database session
         race: Race model
         ff1_session: FastF1 session object
+        telemetry_by_driver: Per-driver telemetry from load_driver_telemetry
         decimate_factor: Keep every Nth point for track shape
     """
     logger.info("Deriving track shape...")
@@ -502,46 +608,50 @@ def ingest_track_shape(
             logger.warning("No fastest lap found")
             return
         
-        telemetry = fastest_lap.get_telemetry()
+        # Slice the reference lap out of the already-loaded telemetry
+        telemetry = telemetry_by_driver.get(fastest_lap['Driver'])
+        if telemetry is not None:
+            telemetry = telemetry[telemetry['LapNumber'] == int(fastest_lap['LapNumber'])]
         if telemetry is None or telemetry.empty:
             logger.warning("No telemetry for fastest lap")
             return
         
-        # Get X, Y coordinates
-        x_values = telemetry['X'].values
-        y_values = telemetry['Y'].values
-        
-        # Normalize
-        x_norm, y_norm = normalize_coordinates(x_values, y_values)
-        
-        # Decimate (sample every Nth point)
-        x_norm = x_norm[::decimate_factor]
-        y_norm = y_norm[::decimate_factor]
-        
-        # Create track shape points
-        for order_idx, (x, y) in enumerate(zip(x_norm, y_norm)):
-            point = TrackShapePoint(
-                race_id=race.id,
-                order_index=order_idx,
-                x_norm=float(x),
-                y_norm=float(y)
-            )
-            db.add(point)
+        # Drop samples without a position: one NaN would make the whole
+        # range NaN and flatten the track to a single point
+        x = telemetry['X'].to_numpy(dtype=np.float32)
+        y = telemetry['Y'].to_numpy(dtype=np.float32)
+        has_position = np.isfinite(x) & np.isfinite(y)
+        if not has_position.any():
+            logger.warning("No position data for fastest lap")
+            return
         
-        db.flush()
+        # Normalize X, Y in place (float32 is plenty for a 0..1 polyline;
+        # the mask already made copies), then decimate (every Nth point) as views
+        x_norm = _normalize_inplace(x[has_position])[::decimate_factor]
+        y_norm = _normalize_inplace(y[has_position])[::decimate_factor]
+        
+        # Create track shape points in one multi-row INSERT. Errors here are
+        # logged, not raised, so contain them in a savepoint rather than
+        # failing the whole ingestion transaction.
+        with db.begin_nested():
+            db.execute(insert(TrackShapePoint), [
+                {"race_id": race.id, "order_index": order_idx, "x_norm": x, "y_norm": y}
+                for order_idx, (x, y) in enumerate(zip(x_norm.tolist(), y_norm.tolist()))
+            ])
         logger.info(f"Created track shape with {len(x_norm)} points")
         
     except Exception as e:
         logger.error(f"Error creating track shape: {e}")
 
 
-def ingest_race_data(year: int, round_num: int) -> None:
+def ingest_race_data(year: int, round_num: int, workers: int | None = None) -> None:
     """
     Main ingestion function for a specific race.
     
     Args:
         year: Season year
         round_num: Race round number
+        workers: Processes for loading telemetry (default: one per CPU)
     """
     settings = get_settings()
     
@@ -559,42 +669,60 @@ def ingest_race_data(year: int, round_num: int) -> None:
         logger.error(f"Failed to load FastF1 session: {e}")
         return
     
+    # Load telemetry once (both telemetry and track shape use it), before
+    # opening the database session: the slow part then holds no transaction
+    # open, and forked workers inherit no database connection
+    telemetry_by_driver = load_driver_telemetry(ff1_session, workers)
+    
     # Create database session
     db = SessionLocal()
     
     try:
         logger.info("Starting database ingestion...")
         
+        # All steps run in one transaction with a single commit at the end:
+        # one WAL flush instead of one per step, and a failed run leaves the
+        # previously ingested data untouched instead of half-replaced.
+        
         # Step 1: Ingest race metadata
         season, race, session = ingest_race_metadata(db, ff1_session)
-        db.commit()
+        # Assign IDs without committing; later steps reference them
+        db.flush()
         logger.info(f"✓ Metadata ingested: {race.name}")
         
         # Step 2: Ingest results
         ingest_results(db, session, ff1_session)
-        db.commit()
+        # Write pending drivers (autoflush is off) so the lookup below sees them
+        db.flush()
         logger.info("✓ Results ingested")
         
+        # One driver code -> ID lookup shared by the remaining steps
+        driver_ids = get_driver_ids_by_code(db)
+        
         # Step 3: Ingest laps
-        ingest_laps(db, session, ff1_session)
-        db.commit()
+        ingest_laps(db, session, ff1_session, driver_ids)
         logger.info("✓ Laps ingested")
         
         # Step 4: Derive stints
-        derive_stints(db, session, ff1_session)
-        db.commit()
+        derive_stints(db, session, ff1_session, driver_ids)
         logger.info("✓ Stints derived")
         
         # Step 5: Ingest telemetry (sampled)
-        ingest_telemetry(db, session, race, ff1_session, sample_rate=10)
-        db.commit()
+        ingest_telemetry(db, session, race, telemetry_by_driver, sample_rate=10, driver_ids=driver_ids)
         logger.info("✓ Telemetry ingested")
         
         # Step 6: Create track shape
-        ingest_track_shape(db, race, ff1_session, decimate_factor=20)
-        db.commit()
+        ingest_track_shape(db, race, ff1_session, telemetry_by_driver, decimate_factor=20)
         logger.info("✓ Track shape created")
         
+        # Bump the race's version on every load, even if its own row is
+        # unchanged: the API derives the race ETag (and its cache keys) from it
+        race.updated_at = datetime.utcnow()
+        db.commit()
+        
+        # Drop cached race -> session lookups that may now be stale
+        clear_caches()
+        
         logger.info(f"✅ Successfully ingested {year} Round {round_num}: {race.name}")
         
     except Exception as e:
@@ -629,6 +757,12 @@ def main():
         choices=["DEBUG", "INFO", "WARNING", "ERROR"],
         help="Logging level"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes for loading telemetry (default: one per CPU)"
+    )
     
     args = parser.parse_args()
     
@@ -640,7 +774,7 @@ def main():
     logger.info(f"F1 Data Ingestion: {args.year} Round {args.round}")
     logger.info("=" * 60)
     
-    ingest_race_data(args.year, args.round)
+    ingest_race_data(args.year, args.round, args.workers)
     
     logger.info("=" * 60)
     logger.info("Ingestion complete!")
@@ -1,62 +1,187 @@
 """
 Common F1 database query functions.
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from datetime import datetime
+from itertools import groupby
+from operator import attrgetter
+from typing import AsyncIterator, Iterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, undefer_group
+from sqlalchemy import Row, case, select, func
 from app.models.f1 import Season, Race, Session as SessionModel, Driver, Team, DriverSessionResult
 from app.models.telemetry import Lap, Stint, TelemetryFrame, TrackShapePoint
 from app.core.exceptions import RaceNotFoundException, SessionNotFoundException, DriverNotFoundException
 
 
-def get_race_by_id(db: Session, race_id: int) -> Race:
-    """Get race by ID."""
-    race = db.get(Race, race_id)
+async def get_race_by_id(db: AsyncSession, race_id: int, include_location: bool = False) -> Race:
+    """Get race by ID; include_location also loads circuit_name/country."""
+    stmt = select(Race).where(Race.id == race_id).options(selectinload(Race.season))
+    if include_location:
+        # A query (not db.get) so the undefer also applies to an already-loaded Race
+        stmt = stmt.options(undefer_group("race_location"))
+    race = (await db.execute(stmt)).scalar_one_or_none()
     if not race:
         raise RaceNotFoundException(f"Race {race_id} not found")
     return race
 
 
-def get_race_main_session(db: Session, race_id: int) -> SessionModel:
+async def get_race_main_session(db: AsyncSession, race_id: int) -> SessionModel:
     """Get the main race session for a race."""
     stmt = (
         select(SessionModel)
         .where(SessionModel.race_id == race_id)
         .where(SessionModel.session_type == "RACE")
     )
-    session = db.execute(stmt).scalar_one_or_none()
+    session = (await db.execute(stmt)).scalar_one_or_none()
     if not session:
         raise SessionNotFoundException(f"No race session found for race {race_id}")
     return session
 
 
-def get_driver_by_code(db: Session, code: str) -> Driver:
+async def get_driver_by_code(db: AsyncSession, code: str) -> Driver:
     """Get driver by code."""
     stmt = select(Driver).where(Driver.code == code.upper())
-    driver = db.execute(stmt).scalar_one_or_none()
+    driver = (await db.execute(stmt)).scalar_one_or_none()
     if not driver:
         raise DriverNotFoundException(f"Driver {code} not found")
     return driver
 
 
-def get_race_results(db: Session, session_id: int) -> list[DriverSessionResult]:
-    """Get race results ordered by position."""
+async def get_drivers_by_codes(db: AsyncSession, codes: list[str]) -> dict[str, Driver]:
+    """Get drivers by code in one query, keyed by code; unknown codes are omitted."""
+    stmt = select(Driver).where(Driver.code.in_([code.upper() for code in codes]))
+    return {driver.code: driver for driver in (await db.execute(stmt)).scalars()}
+
+
+async def get_driver_codes(db: AsyncSession, driver_ids: list[int]) -> dict[int, str]:
+    """Map driver IDs to driver codes in one query; unknown IDs are omitted."""
+    stmt = select(Driver.id, Driver.code).where(Driver.id.in_(driver_ids))
+    return dict((await db.execute(stmt)).all())
+
+
+async def get_race_results(
+    db: AsyncSession,
+    session_id: int,
+    include_text: bool = False
+) -> list[DriverSessionResult]:
+    """Get race results ordered by position; include_text also loads time/gap text."""
     stmt = (
         select(DriverSessionResult)
         .where(DriverSessionResult.session_id == session_id)
+        # Every caller reads driver/team: two IN-queries instead of one SELECT per row
+        .options(
+            selectinload(DriverSessionResult.driver),
+            selectinload(DriverSessionResult.team)
+        )
         .order_by(DriverSessionResult.position.nulls_last())
     )
-    return list(db.execute(stmt).scalars().all())
+    if include_text:
+        stmt = stmt.options(undefer_group("result_text"))
+    return list((await db.execute(stmt)).scalars().all())
+
+
+# Classified statuses that still count as finishing (lapped cars)
+CLASSIFIED_STATUSES = ("Finished", "+1 Lap", "+2 Laps")
+
+
+async def get_race_counts(db: AsyncSession, session_id: int) -> tuple[int, int, int]:
+    """Get (total, finished, dnf) driver counts for a session in one aggregate query."""
+    stmt = (
+        select(
+            func.count(),
+            func.count(case((DriverSessionResult.final_status == "Finished", 1))),
+            func.count(
+                case((
+                    DriverSessionResult.final_status.contains("DNF")
+                    | DriverSessionResult.final_status.not_in(CLASSIFIED_STATUSES),
+                    1
+                ))
+            )
+        )
+        .where(DriverSessionResult.session_id == session_id)
+    )
+    total, finished, dnf = (await db.execute(stmt)).one()
+    return total, finished, dnf
+
 
+async def get_race_podium(db: AsyncSession, session_id: int, limit: int = 3) -> list[DriverSessionResult]:
+    """Get the top classified results (positions 1..limit) with driver and team."""
+    stmt = (
+        select(DriverSessionResult)
+        .where(DriverSessionResult.session_id == session_id)
+        .where(DriverSessionResult.position.between(1, limit))
+        .options(
+            joinedload(DriverSessionResult.driver),
+            joinedload(DriverSessionResult.team)
+        )
+        .order_by(DriverSessionResult.position)
+        .limit(limit)
+    )
+    return list((await db.execute(stmt)).scalars().all())
 
-def get_driver_laps(
-    db: Session, 
+
+async def get_race_result_rows(db: AsyncSession, session_id: int) -> list[Row]:
+    """Get the race classification as plain rows labelled like ResultSchema."""
+    stmt = (
+        select(
+            DriverSessionResult.position,
+            Driver.code.label("driver_code"),
+            Driver.full_name.label("driver_name"),
+            Team.short_name.label("team"),
+            DriverSessionResult.points,
+            DriverSessionResult.time_text,
+            DriverSessionResult.gap_to_winner_text,
+            DriverSessionResult.final_status,
+            DriverSessionResult.grid_position
+        )
+        .join(Driver, Driver.id == DriverSessionResult.driver_id)
+        .join(Team, Team.id == DriverSessionResult.team_id)
+        .where(DriverSessionResult.session_id == session_id)
+        .order_by(DriverSessionResult.position.nulls_last())
+    )
+    return list((await db.execute(stmt)).all())
+
+
+async def get_session_driver_rows(db: AsyncSession, session_id: int) -> list[Row]:
+    """Get a session's drivers with their team as plain rows labelled like DriverWithTeamSchema."""
+    stmt = (
+        select(
+            Driver.id,
+            Driver.code,
+            Driver.full_name,
+            Team.short_name.label("team")
+        )
+        .join(DriverSessionResult, DriverSessionResult.driver_id == Driver.id)
+        .join(Team, Team.id == DriverSessionResult.team_id)
+        .where(DriverSessionResult.session_id == session_id)
+        .order_by(DriverSessionResult.position.nulls_last())
+    )
+    return list((await db.execute(stmt)).all())
+
+
+async def get_driver_laps(
+    db: AsyncSession, 
     session_id: int, 
     driver_id: int, 
     lap_range: tuple[int, int] | None = None
-) -> list[Lap]:
-    """Get laps for a driver in a session, optionally filtered by lap range."""
+) -> Iterator[Row]:
+    """Get laps for a driver in a session, optionally filtered by lap range.
+
+    Returns an iterator over plain rows with the LapSchema columns (no ORM
+    instances), to be consumed once, e.g. directly by a list validator.
+    """
     stmt = (
-        select(Lap)
+        select(
+            Lap.lap_number,
+            Lap.lap_time_sec,
+            Lap.sector1_time_sec,
+            Lap.sector2_time_sec,
+            Lap.sector3_time_sec,
+            Lap.is_pit_lap,
+            Lap.tyre_compound,
+            Lap.tyre_life_laps,
+            Lap.track_status
+        )
         .where(Lap.session_id == session_id)
         .where(Lap.driver_id == driver_id)
     )
@@ -66,10 +191,10 @@ def get_driver_laps(
         stmt = stmt.where(Lap.lap_number >= start_lap).where(Lap.lap_number <= end_lap)
     
     stmt = stmt.order_by(Lap.lap_number)
-    return list(db.execute(stmt).scalars().all())
+    return await db.execute(stmt)
 
 
-def get_driver_stints(db: Session, session_id: int, driver_id: int) -> list[Stint]:
+async def get_driver_stints(db: AsyncSession, session_id: int, driver_id: int) -> list[Stint]:
     """Get stints for a driver in a session."""
     stmt = (
         select(Stint)
@@ -77,96 +202,136 @@ def get_driver_stints(db: Session, session_id: int, driver_id: int) -> list[Stin
         .where(Stint.driver_id == driver_id)
         .order_by(Stint.stint_number)
     )
-    return list(db.execute(stmt).scalars().all())
+    return list((await db.execute(stmt)).scalars().all())
 
 
-def get_all_session_stints(db: Session, session_id: int) -> list[Stint]:
-    """Get all stints in a session."""
-    stmt = (
-        select(Stint)
-        .where(Stint.session_id == session_id)
-        .order_by(Stint.driver_id, Stint.stint_number)
-    )
-    return list(db.execute(stmt).scalars().all())
+async def get_session_stints_by_driver(
+    db: AsyncSession,
+    session_id: int,
+    driver_ids: list[int] | None = None
+) -> dict[int, list[Stint]]:
+    """Get stints in a session, grouped by driver_id (each list ordered by stint number)."""
+    stmt = select(Stint).where(Stint.session_id == session_id)
+    
+    if driver_ids is not None:
+        stmt = stmt.where(Stint.driver_id.in_(driver_ids))
+    
+    stmt = stmt.order_by(Stint.driver_id, Stint.stint_number)
+    stints = (await db.execute(stmt)).scalars()
+    return {
+        driver_id: list(driver_stints)
+        for driver_id, driver_stints in groupby(stints, key=attrgetter("driver_id"))
+    }
 
 
-def get_track_shape(db: Session, race_id: int) -> list[TrackShapePoint]:
-    """Get track shape points for a race."""
+async def get_track_shape(db: AsyncSession, race_id: int) -> list[Row]:
+    """Get track shape points for a race as (order_index, x_norm, y_norm) rows."""
     stmt = (
-        select(TrackShapePoint)
+        select(TrackShapePoint.order_index, TrackShapePoint.x_norm, TrackShapePoint.y_norm)
         .where(TrackShapePoint.race_id == race_id)
         .order_by(TrackShapePoint.order_index)
     )
-    return list(db.execute(stmt).scalars().all())
+    return list((await db.execute(stmt)).all())
 
 
-def get_telemetry_frames(
-    db: Session, 
-    session_id: int, 
-    driver_ids: list[int] | None = None
-) -> list[TelemetryFrame]:
-    """Get telemetry frames for a session, optionally filtered by drivers."""
+async def stream_telemetry_batches(
+    db: AsyncSession,
+    session_id: int,
+    driver_ids: list[int] | None = None,
+    batch_size: int = 4096
+) -> AsyncIterator[list[Row]]:
+    """
+    Stream a session's telemetry in time order through a server-side cursor.
+    
+    Rows carry driver_id, t_rel_sec, lap_number, x_norm, y_norm and
+    speed_kph, i.e. only covering index columns, and are fetched and yielded
+    batch_size at a time instead of materializing the session. Driver codes
+    are left to get_driver_codes: joining drivers would ship a code with
+    every sample and could make the planner sort before the first row.
+    """
     stmt = (
-        select(TelemetryFrame)
+        select(
+            TelemetryFrame.driver_id,
+            TelemetryFrame.t_rel_sec,
+            TelemetryFrame.lap_number,
+            TelemetryFrame.x_norm,
+            TelemetryFrame.y_norm,
+            TelemetryFrame.speed_kph
+        )
         .where(TelemetryFrame.session_id == session_id)
     )
     
     if driver_ids:
         stmt = stmt.where(TelemetryFrame.driver_id.in_(driver_ids))
     
-    stmt = stmt.order_by(TelemetryFrame.t_rel_sec, TelemetryFrame.driver_id)
-    return list(db.execute(stmt).scalars().all())
-
-
-def count_pit_stops(db: Session, session_id: int, driver_id: int) -> int:
-    """Count pit stops for a driver in a session."""
     stmt = (
-        select(func.count())
-        .select_from(Lap)
-        .where(Lap.session_id == session_id)
-        .where(Lap.driver_id == driver_id)
-        .where(Lap.is_pit_lap == True)
+        stmt.order_by(TelemetryFrame.t_rel_sec, TelemetryFrame.driver_id)
+        .execution_options(yield_per=batch_size)
     )
-    return db.execute(stmt).scalar() or 0
+    result = await db.stream(stmt)
+    # Await once per fetched batch rather than once per row
+    async for partition in result.partitions():
+        yield partition
 
 
-def get_lap_statistics(
-    db: Session, 
-    session_id: int, 
-    driver_id: int, 
+async def get_race_version(db: AsyncSession, race_id: int) -> datetime | None:
+    """
+    Get a race's updated_at, which ingestion bumps on every successful (re-)ingest.
+
+    Returns None if the race doesn't exist.
+    """
+    stmt = select(Race.updated_at).where(Race.id == race_id)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def get_lap_summaries(
+    db: AsyncSession,
+    session_id: int,
+    driver_ids: list[int],
     lap_range: tuple[int, int] | None = None
-) -> dict:
+) -> dict[int, dict]:
     """
-    Get aggregated lap statistics for a driver.
+    Get lap statistics and pit stop counts for several drivers in one query.
+    
+    Returns dict keyed by driver_id with:
+        - lap_statistics: avg/min/max lap time in seconds and total_laps,
+          over timed, non-pit laps within lap_range
+        - pit_stops: Number of pit laps in the whole session
     
-    Returns dict with:
-        - avg_lap_time: Average lap time in seconds
-        - min_lap_time: Fastest lap time
-        - max_lap_time: Slowest lap time
-        - total_laps: Number of laps
+    Drivers without laps are omitted.
     """
+    # Statistics use timed, non-pit laps in the range; pit stops count the whole race
+    timed = (Lap.lap_time_sec != None) & (Lap.is_pit_lap == False)
+    if lap_range:
+        start_lap, end_lap = lap_range
+        timed = timed & Lap.lap_number.between(start_lap, end_lap)
+    
     stmt = (
         select(
-            func.avg(Lap.lap_time_sec).label("avg_lap_time"),
-            func.min(Lap.lap_time_sec).label("min_lap_time"),
-            func.max(Lap.lap_time_sec).label("max_lap_time"),
-            func.count().label("total_laps")
+            Lap.driver_id,
+            func.avg(Lap.lap_time_sec).filter(timed).label("avg_lap_time"),
+            func.min(Lap.lap_time_sec).filter(timed).label("min_lap_time"),
+            func.max(Lap.lap_time_sec).filter(timed).label("max_lap_time"),
+            func.count().filter(timed).label("total_laps"),
+            func.count().filter(Lap.is_pit_lap == True).label("pit_stops")
         )
         .where(Lap.session_id == session_id)
-        .where(Lap.driver_id == driver_id)
-        .where(Lap.lap_time_sec != None)
-        .where(Lap.is_pit_lap == False)  # Exclude pit laps
+        .where(Lap.driver_id.in_(driver_ids))
+        .group_by(Lap.driver_id)
     )
     
-    if lap_range:
-        start_lap, end_lap = lap_range
-        stmt = stmt.where(Lap.lap_number >= start_lap).where(Lap.lap_number <= end_lap)
-    
-    result = db.execute(stmt).one()
-    
+    # lap_time_sec is double precision, so the aggregates already arrive as
+    # float (NULL when no lap matched) and the counts as int (never NULL)
     return {
-        "avg_lap_time": float(result.avg_lap_time) if result.avg_lap_time else None,
-        "min_lap_time": float(result.min_lap_time) if result.min_lap_time else None,
-        "max_lap_time": float(result.max_lap_time) if result.max_lap_time else None,
-        "total_laps": int(result.total_laps) if result.total_laps else 0
-    }
\ No newline at end of file
+        driver_id: {
+            "lap_statistics": {
+                "avg_lap_time": avg_lap_time,
+                "min_lap_time": min_lap_time,
+                "max_lap_time": max_lap_time,
+                "total_laps": total_laps
+            },
+            "pit_stops": pit_stops
+        }
+        for driver_id, avg_lap_time, min_lap_time, max_lap_time, total_laps, pit_stops
+        in (await db.execute(stmt)).all()
+    }
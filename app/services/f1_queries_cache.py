@@ -0,0 +1,109 @@
+"""
+Process-local caches for F1 lookups (and answers derived from them) that do
+not change once a race is ingested.
+"""
+import hashlib
+
+from cachetools import LRUCache, TTLCache
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.schemas.telemetry import TrackShapePointSchema
+from app.services import f1_queries
+
+# race_id -> id of the race's main (RACE) session
+race_main_session_ids: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+
+# race_id -> ETag of the race's ingested data. Ingestion runs in another
+# process and cannot clear this, so the TTL bounds how long a re-ingested race
+# keeps its old tag (and the ETag-keyed caches below their old entries).
+race_etags: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+# (race_id, ETag) -> serialized track shape polyline (JSON bytes)
+track_shapes: LRUCache = LRUCache(maxsize=256)
+
+# (race_id, ETag, drivers, lap_range) -> (chat context dict, serialized prompt prefix)
+chat_contexts: LRUCache = LRUCache(maxsize=512)
+
+# (race_id, ETag, drivers, focus, lap_range, normalized question) -> ChatResponse
+chat_answers: TTLCache = TTLCache(maxsize=4096, ttl=7 * 24 * 3600)
+
+TRACK_SHAPE_LIST_ADAPTER = TypeAdapter(list[TrackShapePointSchema])
+
+
+async def get_race_main_session_id(db: AsyncSession, race_id: int) -> int:
+    """
+    Get the main race session ID for a race, cached per race_id.
+
+    Misses are resolved on the caller's session. Lookups that raise
+    (race or session not found) are not cached.
+
+    Raises:
+        SessionNotFoundException: If the race has no main session
+    """
+    session_id = race_main_session_ids.get(race_id)
+    if session_id is None:
+        session = await f1_queries.get_race_main_session(db, race_id)
+        session_id = race_main_session_ids[race_id] = session.id
+    return session_id
+
+
+async def get_race_etag(db: AsyncSession, race_id: int) -> str | None:
+    """
+    Get a strong ETag for a race's data, cached per race_id.
+
+    Derived from the race's updated_at, which ingestion sets on every
+    successful load, so re-ingesting a race (even with unchanged laps)
+    yields a new tag. Returns None (not cached) if the race doesn't exist.
+    """
+    etag = race_etags.get(race_id)
+    if etag is None:
+        updated_at = await f1_queries.get_race_version(db, race_id)
+        if updated_at is None:
+            return None
+        digest = hashlib.sha1(f"{race_id}:{updated_at.isoformat()}".encode()).hexdigest()
+        etag = race_etags[race_id] = f'"{digest[:20]}"'
+    return etag
+
+
+async def get_track_shape_json(db: AsyncSession, race_id: int) -> bytes:
+    """
+    Get a race's track shape as a JSON array of TrackShapePointSchema, cached per race and ETag.
+
+    A hit needs neither a track shape query nor schema validation. Keyed by
+    the race's ETag because ingestion runs in another process, so its
+    clear_caches() never reaches the API workers; a re-ingested race gets a
+    new ETag instead (within race_etags' 30 s TTL).
+
+    Raises:
+        RaceNotFoundException: If the race doesn't exist
+    """
+    etag = await get_race_etag(db, race_id)
+    if etag is None:
+        # Raises RaceNotFoundException
+        await f1_queries.get_race_by_id(db, race_id)
+    key = (race_id, etag)
+    blob = track_shapes.get(key)
+    if blob is None:
+        points = await f1_queries.get_track_shape(db, race_id)
+        # Validating and serializing hundreds of points is CPU work; keep it off the event loop
+        blob = track_shapes[key] = await run_in_threadpool(_serialize_track_shape, points)
+    return blob
+
+
+def _serialize_track_shape(points: list[Row]) -> bytes:
+    """Validate track shape rows and serialize them as a JSON array."""
+    return TRACK_SHAPE_LIST_ADAPTER.dump_json(
+        TRACK_SHAPE_LIST_ADAPTER.validate_python(points, from_attributes=True)
+    )
+
+
+def clear_caches() -> None:
+    """Drop all cached lookups (call after (re-)ingesting race data)."""
+    race_main_session_ids.clear()
+    race_etags.clear()
+    track_shapes.clear()
+    chat_contexts.clear()
+    chat_answers.clear()
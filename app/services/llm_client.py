@@ -2,14 +2,26 @@
 LLM client abstraction supporting multiple providers.
 Supports free/open models like Llama, Mistral, Qwen via Ollama or OpenAI-compatible APIs.
 """
-from typing import Protocol
+import asyncio
+import hashlib
+import random
+from typing import AsyncIterator, Awaitable, Callable, Protocol
 import httpx
+import orjson
+from cachetools import LRUCache
 from app.config import Settings
 from app.core.logging import get_logger
 from app.core.exceptions import LLMException
 
 logger = get_logger(__name__)
 
+# Statuses worth retrying: rate limited, or the server is restarting / warming up
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Backoff bounds (seconds) between retries
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 20.0
+
 
 class LLMClient(Protocol):
     """Protocol for LLM client implementations."""
@@ -29,9 +41,141 @@ class LLMClient(Protocol):
             LLMException: If the LLM call fails
         """
         ...
+    
+    def ask_stream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """
+        Send a question to the LLM and yield the response text as it is generated.
+        
+        Chunks are yielded as the server sends them, so the first words can be
+        forwarded to a client long before the full answer exists.
+        
+        Raises:
+            LLMException: If the LLM call fails (possibly after some chunks)
+        """
+        ...
+    
+    async def ask_many(self, prompts: list[tuple[str, str]]) -> list[str]:
+        """
+        Ask several (system_prompt, user_prompt) pairs concurrently.
+        
+        Returns:
+            Responses in the order of `prompts`
+            
+        Raises:
+            LLMException: If any LLM call fails
+        """
+        ...
+    
+    async def aclose(self) -> None:
+        """Release pooled connections (call on application shutdown)."""
+        ...
+
+
+async def _ask_concurrently(
+    ask: Callable[[str, str], Awaitable[str]],
+    prompts: list[tuple[str, str]],
+    max_concurrency: int
+) -> list[str]:
+    """Run ask() over prompt pairs with at most max_concurrency calls in flight."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def ask_one(system_prompt: str, user_prompt: str) -> str:
+        async with semaphore:
+            return await ask(system_prompt, user_prompt)
+    
+    return await asyncio.gather(*(ask_one(*prompt) for prompt in prompts))
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    """Seconds to wait from a Retry-After header in delta-seconds form, if present."""
+    try:
+        return max(0.0, float(response.headers["retry-after"]))
+    except (KeyError, ValueError):
+        return None
+
+
+class _PooledHTTPClient:
+    """
+    Holds one long-lived httpx.AsyncClient per LLM client instance.
+    
+    Reusing the client keeps connections to the LLM server alive between
+    calls instead of paying a new TCP (and TLS) handshake on every request.
+    """
+    
+    timeout: int
+    max_connections: int
+    max_keepalive_connections: int
+    max_retries: int
+    _client: httpx.AsyncClient | None = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections
+                )
+            )
+        return self._client
+    
+    async def _post(self, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+        """
+        POST with retries, raising for any final error status.
+        
+        With stream=True the body is left unread for aiter_lines(); the
+        caller must close the response. Retries only happen before the body
+        starts, never mid-stream.
+        
+        Connection failures and RETRY_STATUS_CODES are retried up to
+        max_retries times, waiting for the server's Retry-After if given and
+        otherwise an exponential backoff with full jitter (so clients that
+        failed together do not retry together). Read timeouts are not
+        retried: the server took the request and is just slow, and asking
+        again would only add load and multiply the wait.
+        """
+        client = self._get_client()
+        request = client.build_request("POST", url, **kwargs)
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = await client.send(request, stream=stream)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    if response.is_error:
+                        # Read (and release) the error body so handlers can log it
+                        await response.aread()
+                    response.raise_for_status()
+                    return response
+                await response.aclose()
+                retry_after = _retry_after_seconds(response)
+                reason = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                if attempt == self.max_retries or isinstance(e, httpx.ReadTimeout):
+                    raise
+                reason = type(e).__name__
+            
+            if retry_after is None:
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            else:
+                delay = min(retry_after, RETRY_MAX_DELAY)
+            logger.warning(
+                f"LLM request failed ({reason}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+    
+    async def ask_many(self, prompts: list[tuple[str, str]]) -> list[str]:
+        """Ask several prompt pairs concurrently, up to one per pooled connection."""
+        return await _ask_concurrently(self.ask, prompts, self.max_connections)
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client, if it was created."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 
-class OllamaLLMClient:
+class OllamaLLMClient(_PooledHTTPClient):
     """
     LLM client for Ollama (local open-source models).
     
@@ -43,8 +187,22 @@ class OllamaLLMClient:
         self.base_url = settings.llm_api_base_url.rstrip("/")
         self.model_name = settings.llm_model_name
         self.timeout = settings.llm_timeout
+        self.max_connections = settings.llm_max_connections
+        self.max_keepalive_connections = settings.llm_max_keepalive_connections
+        self.max_retries = settings.llm_max_retries
         logger.info(f"Initialized OllamaLLMClient with model: {self.model_name} at {self.base_url}")
     
+    def _chat_payload(self, system_prompt: str, user_prompt: str, stream: bool) -> dict:
+        """/api/chat request body for one prompt pair."""
+        return {
+            "model": self.model_name,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "stream": stream
+        }
+    
     async def ask(self, system_prompt: str, user_prompt: str) -> str:
         """
         Call Ollama API.
@@ -61,30 +219,21 @@ class OllamaLLMClient:
         }
         """
         url = f"{self.base_url}/api/chat"
-        payload = {
-            "model": self.model_name,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "stream": False
-        }
+        payload = self._chat_payload(system_prompt, user_prompt, stream=False)
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                logger.debug(f"Calling Ollama API: {url}")
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                
-                data = response.json()
-                # Ollama response format: {"message": {"role": "assistant", "content": "..."}}
-                answer = data.get("message", {}).get("content", "")
-                
-                if not answer:
-                    raise LLMException("Empty response from Ollama")
-                
-                logger.debug(f"Received response from Ollama: {len(answer)} chars")
-                return answer
+            logger.debug(f"Calling Ollama API: {url}")
+            response = await self._post(url, json=payload)
+            
+            data = response.json()
+            # Ollama response format: {"message": {"role": "assistant", "content": "..."}}
+            answer = data.get("message", {}).get("content", "")
+            
+            if not answer:
+                raise LLMException("Empty response from Ollama")
+            
+            logger.debug(f"Received response from Ollama: {len(answer)} chars")
+            return answer
                 
         except httpx.HTTPStatusError as e:
             logger.error(f"Ollama HTTP error: {e.response.status_code} - {e.response.text}")
@@ -95,9 +244,48 @@ class OllamaLLMClient:
         except Exception as e:
             logger.error(f"Unexpected error calling Ollama: {str(e)}")
             raise LLMException(f"Ollama error: {str(e)}")
+    
+    async def ask_stream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """
+        Call Ollama API with "stream": true.
+        
+        The response is newline-delimited JSON, one object per chunk:
+        {"message": {"role": "assistant", "content": "..."}, "done": false}
+        """
+        url = f"{self.base_url}/api/chat"
+        payload = self._chat_payload(system_prompt, user_prompt, stream=True)
+        received = 0
+        
+        try:
+            logger.debug(f"Streaming from Ollama API: {url}")
+            response = await self._post(url, stream=True, json=payload)
+            try:
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = orjson.loads(line)
+                    if data.get("error"):
+                        raise LLMException(f"Ollama error: {data['error']}")
+                    chunk = data.get("message", {}).get("content")
+                    if chunk:
+                        received += len(chunk)
+                        yield chunk
+            finally:
+                await response.aclose()
+                
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Ollama HTTP error: {e.response.status_code} - {e.response.text}")
+            raise LLMException(f"Ollama HTTP error: {e.response.status_code}")
+        except httpx.RequestError as e:
+            logger.error(f"Ollama request error: {str(e)}")
+            raise LLMException(f"Failed to connect to Ollama: {str(e)}")
+        
+        if not received:
+            raise LLMException("Empty response from Ollama")
+        logger.debug(f"Streamed response from Ollama: {received} chars")
 
 
-class OpenAICompatibleLLMClient:
+class OpenAICompatibleLLMClient(_PooledHTTPClient):
     """
     LLM client for OpenAI-compatible APIs.
     
@@ -113,8 +301,26 @@ class OpenAICompatibleLLMClient:
         self.model_name = settings.llm_model_name
         self.api_key = settings.llm_api_key
         self.timeout = settings.llm_timeout
+        self.max_connections = settings.llm_max_connections
+        self.max_keepalive_connections = settings.llm_max_keepalive_connections
+        self.max_retries = settings.llm_max_retries
         logger.info(f"Initialized OpenAICompatibleLLMClient with model: {self.model_name} at {self.base_url}")
     
+    def _chat_payload(self, system_prompt: str, user_prompt: str) -> dict:
+        """Chat completions request body for one prompt pair."""
+        return {
+            "model": self.model_name,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.7
+        }
+    
+    def _auth_headers(self) -> dict[str, str]:
+        """Authorization header, if an API key is configured."""
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+    
     async def ask(self, system_prompt: str, user_prompt: str) -> str:
         """
         Call OpenAI-compatible API.
@@ -131,34 +337,22 @@ class OpenAICompatibleLLMClient:
         }
         """
         url = f"{self.base_url}/v1/chat/completions"
-        payload = {
-            "model": self.model_name,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "temperature": 0.7
-        }
-        
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
+        payload = self._chat_payload(system_prompt, user_prompt)
+        headers = {"Content-Type": "application/json", **self._auth_headers()}
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                logger.debug(f"Calling OpenAI-compatible API: {url}")
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                data = response.json()
-                # OpenAI response format: {"choices": [{"message": {"content": "..."}}]}
-                answer = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                
-                if not answer:
-                    raise LLMException("Empty response from LLM")
-                
-                logger.debug(f"Received response from LLM: {len(answer)} chars")
-                return answer
+            logger.debug(f"Calling OpenAI-compatible API: {url}")
+            response = await self._post(url, json=payload, headers=headers)
+            
+            data = response.json()
+            # OpenAI response format: {"choices": [{"message": {"content": "..."}}]}
+            answer = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            
+            if not answer:
+                raise LLMException("Empty response from LLM")
+            
+            logger.debug(f"Received response from LLM: {len(answer)} chars")
+            return answer
                 
         except httpx.HTTPStatusError as e:
             logger.error(f"LLM HTTP error: {e.response.status_code} - {e.response.text}")
@@ -169,6 +363,234 @@ class OpenAICompatibleLLMClient:
         except Exception as e:
             logger.error(f"Unexpected error calling LLM: {str(e)}")
             raise LLMException(f"LLM error: {str(e)}")
+    
+    async def ask_stream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """
+        Call OpenAI-compatible API with "stream": true.
+        
+        The response is server-sent events, one chunk per "data:" line, ending
+        with "data: [DONE]":
+        data: {"choices": [{"delta": {"content": "..."}}]}
+        """
+        url = f"{self.base_url}/v1/chat/completions"
+        payload = {**self._chat_payload(system_prompt, user_prompt), "stream": True}
+        headers = {"Content-Type": "application/json", **self._auth_headers()}
+        received = 0
+        
+        try:
+            logger.debug(f"Streaming from OpenAI-compatible API: {url}")
+            response = await self._post(url, stream=True, json=payload, headers=headers)
+            try:
+                async for line in response.aiter_lines():
+                    # Skip blank separators, SSE comments (keep-alives) and other fields
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = orjson.loads(data).get("choices") or [{}]
+                    chunk = (choices[0].get("delta") or {}).get("content")
+                    if chunk:
+                        received += len(chunk)
+                        yield chunk
+            finally:
+                await response.aclose()
+                
+        except httpx.HTTPStatusError as e:
+            logger.error(f"LLM HTTP error: {e.response.status_code} - {e.response.text}")
+            raise LLMException(f"LLM HTTP error: {e.response.status_code}")
+        except httpx.RequestError as e:
+            logger.error(f"LLM request error: {str(e)}")
+            raise LLMException(f"Failed to connect to LLM: {str(e)}")
+        
+        if not received:
+            raise LLMException("Empty response from LLM")
+        logger.debug(f"Streamed response from LLM: {received} chars")
+    
+    async def ask_batch(
+        self,
+        prompts: list[tuple[str, str]],
+        poll_interval: float = 30.0
+    ) -> list[str | None]:
+        """
+        Answer prompt pairs through the Batch API (for offline, non-latency-sensitive jobs).
+        
+        Batch requests are billed at a discount and do not count against the
+        interactive rate limits, but complete within the provider's window
+        (up to 24h) instead of seconds. Needs a server implementing
+        /v1/files and /v1/batches (e.g. OpenAI).
+        
+        Flow: upload a JSONL file of chat completion requests (POST /v1/files),
+        create the batch (POST /v1/batches), poll GET /v1/batches/{id} until it
+        finishes, then download the output file and match lines by custom_id.
+        
+        Args:
+            prompts: (system_prompt, user_prompt) pairs
+            poll_interval: Seconds between status checks
+            
+        Returns:
+            Responses in the order of `prompts`; None for requests that failed
+            
+        Raises:
+            LLMException: If the batch cannot be submitted or does not complete
+        """
+        if not prompts:
+            return []
+        
+        client = self._get_client()
+        headers = self._auth_headers()
+        batch_input = b"".join(
+            orjson.dumps({
+                "custom_id": str(index),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._chat_payload(system_prompt, user_prompt)
+            }) + b"\n"
+            for index, (system_prompt, user_prompt) in enumerate(prompts)
+        )
+        
+        try:
+            response = await client.post(
+                f"{self.base_url}/v1/files",
+                headers=headers,
+                data={"purpose": "batch"},
+                files={"file": ("batch.jsonl", batch_input, "application/jsonl")}
+            )
+            response.raise_for_status()
+            input_file_id = response.json()["id"]
+            
+            response = await client.post(
+                f"{self.base_url}/v1/batches",
+                headers=headers,
+                json={
+                    "input_file_id": input_file_id,
+                    "endpoint": "/v1/chat/completions",
+                    "completion_window": "24h"
+                }
+            )
+            response.raise_for_status()
+            batch = response.json()
+            logger.info(f"Submitted LLM batch {batch['id']} ({len(prompts)} requests)")
+            
+            while batch["status"] not in ("completed", "failed", "expired", "cancelled"):
+                await asyncio.sleep(poll_interval)
+                response = await client.get(f"{self.base_url}/v1/batches/{batch['id']}", headers=headers)
+                response.raise_for_status()
+                batch = response.json()
+            
+            if batch["status"] != "completed" or not batch.get("output_file_id"):
+                raise LLMException(f"LLM batch {batch['id']} ended with status {batch['status']}")
+            
+            response = await client.get(
+                f"{self.base_url}/v1/files/{batch['output_file_id']}/content",
+                headers=headers
+            )
+            response.raise_for_status()
+            
+        except httpx.HTTPStatusError as e:
+            logger.error(f"LLM batch HTTP error: {e.response.status_code} - {e.response.text}")
+            raise LLMException(f"LLM batch HTTP error: {e.response.status_code}")
+        except httpx.RequestError as e:
+            logger.error(f"LLM batch request error: {str(e)}")
+            raise LLMException(f"Failed to connect to LLM: {str(e)}")
+        
+        # Output lines come back in any order: {"custom_id", "response": {"status_code", "body"}, "error"}
+        answers: list[str | None] = [None] * len(prompts)
+        for line in response.content.splitlines():
+            if not line.strip():
+                continue
+            result = orjson.loads(line)
+            body = (result.get("response") or {}).get("body") or {}
+            answer = body.get("choices", [{}])[0].get("message", {}).get("content")
+            if answer:
+                answers[int(result["custom_id"])] = answer
+        
+        failed = answers.count(None)
+        if failed:
+            logger.warning(f"LLM batch {batch['id']}: {failed} of {len(prompts)} requests failed")
+        return answers
+
+class CachedLLMClient:
+    """
+    LLMClient decorator that answers repeated prompts from an in-process LRU cache.
+    
+    Keyed by a SHA-256 of (model, system prompt, user prompt), so only
+    byte-identical prompts hit; failed calls are not cached.
+    """
+    
+    def __init__(self, inner: LLMClient, model_name: str, maxsize: int, max_concurrency: int):
+        self.inner = inner
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.answers: LRUCache = LRUCache(maxsize=maxsize)
+        logger.info(f"LLM response cache enabled ({maxsize} entries)")
+    
+    def _key(self, system_prompt: str, user_prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (self.model_name, system_prompt, user_prompt):
+            digest.update(part.encode())
+            # Separator so ("ab", "c") and ("a", "bc") get different keys
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    async def ask(self, system_prompt: str, user_prompt: str) -> str:
+        """Answer from the cache, or ask the wrapped client and cache its answer."""
+        key = self._key(system_prompt, user_prompt)
+        answer = self.answers.get(key)
+        if answer is None:
+            answer = self.answers[key] = await self.inner.ask(system_prompt, user_prompt)
+        else:
+            logger.debug("LLM response cache hit")
+        return answer
+    
+    async def ask_stream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """Yield a cached answer whole, or stream the wrapped client's and cache it once complete."""
+        key = self._key(system_prompt, user_prompt)
+        answer = self.answers.get(key)
+        if answer is not None:
+            logger.debug("LLM response cache hit")
+            yield answer
+            return
+        
+        chunks = []
+        async for chunk in self.inner.ask_stream(system_prompt, user_prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.answers[key] = "".join(chunks)
+    
+    async def ask_batch(
+        self,
+        prompts: list[tuple[str, str]],
+        poll_interval: float = 30.0
+    ) -> list[str | None]:
+        """
+        Answer cached prompts from memory and send the rest through the wrapped client's Batch API.
+        
+        Raises:
+            LLMException: If the wrapped client has no Batch API, or the batch fails
+        """
+        ask_batch = getattr(self.inner, "ask_batch", None)
+        if ask_batch is None:
+            raise LLMException(f"{type(self.inner).__name__} does not support the Batch API")
+        
+        keys = [self._key(*prompt) for prompt in prompts]
+        answers = [self.answers.get(key) for key in keys]
+        missing = [index for index, answer in enumerate(answers) if answer is None]
+        if missing:
+            batch_answers = await ask_batch([prompts[index] for index in missing], poll_interval)
+            for index, answer in zip(missing, batch_answers):
+                answers[index] = answer
+                if answer is not None:
+                    self.answers[keys[index]] = answer
+        return answers
+    
+    async def ask_many(self, prompts: list[tuple[str, str]]) -> list[str]:
+        """Ask several prompt pairs concurrently, answering cached ones from memory."""
+        return await _ask_concurrently(self.ask, prompts, self.max_concurrency)
+    
+    async def aclose(self) -> None:
+        """Close the wrapped client."""
+        await self.inner.aclose()
 
 
 def get_llm_client(settings: Settings) -> LLMClient:
@@ -187,15 +609,31 @@ def get_llm_client(settings: Settings) -> LLMClient:
     Supported providers:
         - "ollama": For local Llama/Mistral/Qwen via Ollama
         - "openai_compatible": For any OpenAI-compatible API
+    
+    Both share one pooled HTTP client per instance, sized by
+    llm_max_connections (requests in flight; more queue inside the client)
+    and llm_max_keepalive_connections (idle connections kept for reuse).
+    Raise them to match the server's concurrency. Chat requests that hit a
+    connection error or a 429/502/503/504 are retried up to llm_max_retries
+    times with backoff.
+    
+    With llm_cache_enabled, the client is wrapped in CachedLLMClient
+    (llm_cache_size entries).
     """
     provider = settings.llm_provider.lower()
     
     if provider == "ollama":
-        return OllamaLLMClient(settings)
+        client = OllamaLLMClient(settings)
     elif provider == "openai_compatible":
-        return OpenAICompatibleLLMClient(settings)
+        client = OpenAICompatibleLLMClient(settings)
     else:
         raise ValueError(
             f"Unsupported LLM provider: {provider}. "
             f"Supported providers: 'ollama', 'openai_compatible'"
-        )
\ No newline at end of file
+        )
+    
+    if settings.llm_cache_enabled:
+        return CachedLLMClient(
+            client, settings.llm_model_name, settings.llm_cache_size, settings.llm_max_connections
+        )
+    return client
\ No newline at end of file
@@ -2,154 +2,270 @@
 Replay service for WebSocket telemetry streaming.
 """
 import asyncio
+import math
 from typing import AsyncGenerator
-from sqlalchemy.orm import Session
+import msgpack
+import numpy as np
+import orjson
+from sqlalchemy import Row
+from app.db import ReplaySessionLocal
 from app.services import f1_queries
-from app.models.telemetry import TelemetryFrame
-from app.schemas.telemetry import ReplayFrameSchema, CarPositionSchema
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def group_frames_by_driver(frames: list[TelemetryFrame]) -> dict[int, TelemetryFrame]:
+# In-flight replay sample; x/y are normalized 0..1, so float32 is plenty.
+# NULL speeds are carried as NaN.
+FRAME_DTYPE = np.dtype([
+    ("t", "f8"),
+    ("drv", "i4"),
+    ("x", "f4"),
+    ("y", "f4"),
+    ("speed", "f4"),
+    ("lap", "u2"),
+])
+
+
+def frames_to_array(frames: list[Row]) -> np.ndarray:
     """
-    Group telemetry frames by driver ID, keeping the latest frame for each driver.
+    Pack telemetry rows into a FRAME_DTYPE array.
+    
+    Rows are transposed into columns once and each field is filled with a
+    single array assignment, instead of building a record per row.
     
     Args:
-        frames: List of telemetry frames
+        frames: Telemetry rows in f1_queries.stream_telemetry_batches column
+            order (driver_id, t_rel_sec, lap_number, x_norm, y_norm, speed_kph)
         
     Returns:
-        Dictionary mapping driver_id to latest TelemetryFrame
+        Structured array with one record per row, in row order
     """
-    driver_frames: dict[int, TelemetryFrame] = {}
-    for frame in frames:
-        driver_frames[frame.driver_id] = frame
-    return driver_frames
+    array = np.empty(len(frames), dtype=FRAME_DTYPE)
+    if not len(frames):
+        return array
+    
+    driver_id, t_rel_sec, lap_number, x_norm, y_norm, speed_kph = zip(*frames)
+    array["t"] = t_rel_sec
+    array["drv"] = driver_id
+    array["x"] = x_norm
+    array["y"] = y_norm
+    # A float array turns NULL (None) speeds into NaN
+    array["speed"] = np.array(speed_kph, dtype=float)
+    array["lap"] = lap_number
+    return array
 
 
-def build_replay_frame(current_time: float, frames: list[TelemetryFrame]) -> ReplayFrameSchema:
+def latest_per_driver(window: np.ndarray) -> np.ndarray:
+    """
+    Keep the latest sample for each driver in a time-ordered window.
+    
+    Args:
+        window: FRAME_DTYPE records ordered by time
+        
+    Returns:
+        One record per driver, ordered by driver ID
+    """
+    # np.unique returns first occurrences, so search the reversed window
+    _, last_from_end = np.unique(window["drv"][::-1], return_index=True)
+    return window[len(window) - 1 - last_from_end]
+
+
+def build_replay_frame(
+    current_time: float,
+    window: np.ndarray,
+    driver_codes: dict[int, str | None]
+) -> dict:
     """
     Build a replay frame from telemetry data.
     
     Args:
         current_time: Current replay time in seconds
-        frames: Telemetry frames for this time window
+        window: FRAME_DTYPE records for this time window
+        driver_codes: Mapping of driver_id to driver code (None for unknown
+            drivers, whose cars are left out)
         
     Returns:
-        ReplayFrameSchema with car positions
+        Frame dict in the ReplayFrameSchema shape, with car positions
     """
-    # Group by driver to get latest position for each
-    driver_frames = group_frames_by_driver(frames)
-    
-    # Build car positions
-    cars = []
-    for driver_id, frame in driver_frames.items():
-        cars.append(
-            CarPositionSchema(
-                driver_code=frame.driver.code,
-                x=frame.x_norm,
-                y=frame.y_norm,
-                speed_kph=frame.speed_kph,
-                lap=frame.lap_number
-            )
+    # Take the latest position for each driver
+    latest = latest_per_driver(window)
+    
+    # Convert to Python values only here, when building the payload. Frames
+    # are send-only and already well-typed, so build the ReplayFrameSchema /
+    # CarPositionSchema shape directly instead of constructing and dumping models.
+    cars = [
+        {
+            "driver_code": driver_code,
+            "x": x,
+            "y": y,
+            "speed_kph": None if math.isnan(speed) else speed,
+            "lap": lap,
+        }
+        for driver_code, x, y, speed, lap in zip(
+            map(driver_codes.get, latest["drv"].tolist()),
+            latest["x"].tolist(),
+            latest["y"].tolist(),
+            latest["speed"].tolist(),
+            latest["lap"].tolist()
         )
+        if driver_code is not None
+    ]
     
-    return ReplayFrameSchema(t=current_time, cars=cars)
+    return {"t": current_time, "cars": cars}
+
+
+def pack_message(payload: dict) -> bytes:
+    """Encode a replay message as MessagePack (binary WebSocket frame)."""
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def dump_message(payload: dict) -> str:
+    """Encode a replay message as JSON (text WebSocket frame)."""
+    return orjson.dumps(payload).decode()
+
+
+async def _wait_for_window(
+    loop: asyncio.AbstractEventLoop,
+    replay_started: float | None,
+    window: int,
+    time_step: float
+) -> float:
+    """
+    Sleep until `window` is due on the replay clock.
+    
+    Deadlines are absolute (replay start + window * time_step on the loop's
+    monotonic clock), so time spent fetching or sending does not accumulate
+    as drift. Returns the replay start time (set on the first call).
+    """
+    now = loop.time()
+    if replay_started is None:
+        replay_started = now - window * time_step
+    delay = replay_started + window * time_step - now
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return replay_started
 
 
 async def generate_replay_frames(
-    db: Session,
     session_id: int,
     fps: int = 10,
     driver_ids: list[int] | None = None
-) -> AsyncGenerator[ReplayFrameSchema, None]:
+) -> AsyncGenerator[dict, None]:
     """
     Generate replay frames for a session as an async generator.
     
+    Telemetry is streamed in time order from a server-side cursor on the
+    replay engine, which has its own (unpooled) connection per stream, so
+    only one batch is held in memory and the API pool is never touched.
+    Each batch is packed into a FRAME_DTYPE array and split into time
+    windows with vectorized NumPy operations.
+    
     Args:
-        db: Database session
         session_id: Session ID to replay
         fps: Frames per second for replay
         driver_ids: Optional list of driver IDs to include (None = all drivers)
         
     Yields:
-        ReplayFrameSchema objects at the specified FPS
+        Frame dicts (ReplayFrameSchema shape) at the specified FPS
     """
     logger.info(f"Starting replay for session {session_id} at {fps} FPS")
     
-    # Load all telemetry frames
-    telemetry_frames = f1_queries.get_telemetry_frames(db, session_id, driver_ids)
-    
-    if not telemetry_frames:
-        logger.warning(f"No telemetry frames found for session {session_id}")
-        return
-    
-    logger.info(f"Loaded {len(telemetry_frames)} telemetry frames")
-    
-    # Get time range
-    min_time = min(frame.t_rel_sec for frame in telemetry_frames)
-    max_time = max(frame.t_rel_sec for frame in telemetry_frames)
-    
-    logger.info(f"Time range: {min_time:.2f}s to {max_time:.2f}s")
-    
     # Calculate time step
     time_step = 1.0 / fps
-    current_time = min_time
-    frame_index = 0
+    start_time: float | None = None
+    driver_codes: dict[int, str | None] = {}
+    # Samples of the last window of a batch, which may continue in the next one
+    pending = np.empty(0, dtype=FRAME_DTYPE)
+    pending_window = 0
+    loop = asyncio.get_running_loop()
+    replay_started: float | None = None  # loop clock time of window 0
+    frame_count = 0
     
-    # Pre-sort frames by time for efficient iteration
-    telemetry_frames.sort(key=lambda f: f.t_rel_sec)
+    async with ReplaySessionLocal() as db:
+        async for rows in f1_queries.stream_telemetry_batches(db, session_id, driver_ids):
+            frame_count += len(rows)
+            batch = frames_to_array(rows)
+            
+            # Resolve codes of drivers not seen yet (normally only on the first batch)
+            new_drivers = set(np.unique(batch["drv"]).tolist()) - driver_codes.keys()
+            if new_drivers:
+                # Telemetry has no FK to drivers: mark every queried ID as
+                # resolved (None if orphaned) so it is not looked up again
+                driver_codes.update(dict.fromkeys(new_drivers))
+                driver_codes.update(await f1_queries.get_driver_codes(db, list(new_drivers)))
+            
+            frames = np.concatenate((pending, batch))
+            if start_time is None:
+                start_time = float(frames["t"][0])
+            
+            # Window k covers (start + k * step, start + (k + 1) * step];
+            # the first sample opens window 0
+            windows = np.maximum(np.ceil((frames["t"] - start_time) / time_step) - 1, 0).astype(np.int64)
+            pending_window = int(windows[-1])
+            closed = windows < pending_window
+            pending = frames[~closed]
+            
+            closed_frames = frames[closed]
+            if not len(closed_frames):
+                continue
+            
+            closed_windows = windows[closed]
+            bounds = np.flatnonzero(np.diff(closed_windows)) + 1
+            for window, window_frames in zip(
+                closed_windows[np.r_[0, bounds]].tolist(),
+                np.split(closed_frames, bounds)
+            ):
+                # Wait until the window is due (skipping empty windows)
+                replay_started = await _wait_for_window(loop, replay_started, window, time_step)
+                yield build_replay_frame(start_time + window * time_step, window_frames, driver_codes)
     
-    while current_time <= max_time:
-        # Collect frames within current time window
-        window_frames = []
-        window_end = current_time + time_step
-        
-        # Advance frame_index to current window
-        while frame_index < len(telemetry_frames):
-            frame = telemetry_frames[frame_index]
-            if frame.t_rel_sec > window_end:
-                break
-            if frame.t_rel_sec >= current_time:
-                window_frames.append(frame)
-            frame_index += 1
-        
-        # Yield frame if we have data
-        if window_frames:
-            replay_frame = build_replay_frame(current_time, window_frames)
-            yield replay_frame
-        
-        # Advance time and sleep
-        current_time += time_step
-        await asyncio.sleep(time_step)
-        
-        # Reset frame_index if needed (for overlapping windows)
-        # In practice, we want to scan forward, so we keep advancing
-        # But we might miss frames if they span multiple windows
-        # For simplicity, we'll rely on grouping within each window
+    if start_time is None:
+        logger.warning(f"No telemetry frames found for session {session_id}")
+        return
     
-    logger.info(f"Replay completed for session {session_id}")
+    await _wait_for_window(loop, replay_started, pending_window, time_step)
+    yield build_replay_frame(start_time + pending_window * time_step, pending, driver_codes)
+    
+    logger.info(f"Replay completed for session {session_id} ({frame_count} telemetry frames)")
 
 
 async def replay_session_websocket(
-    db: Session,
     session_id: int,
     fps: int,
-    send_callback: callable
+    send_callback: callable,
+    batch_size: int | None = None
 ) -> None:
     """
     Run replay and send frames via WebSocket callback.
     
+    Frames are sent in packets of `batch_size` consecutive frames,
+    {"t0": <first frame time>, "frames": [...]}, trading up to
+    batch_size / fps of latency for far fewer sends per viewer. Windows
+    without samples produce no frame, so frames are not evenly spaced:
+    clients schedule each one at frame["t"] - t0 after the packet starts.
+    
     Args:
-        db: Database session
         session_id: Session ID to replay
         fps: Frames per second
-        send_callback: Async function to send data (e.g., websocket.send_json)
+        send_callback: Async function taking the packet dict (JSON or MessagePack sender)
+        batch_size: Frames per packet (default: max(1, fps // 2), i.e. 5 at 10 FPS)
     """
+    batch_size = batch_size or max(1, fps // 2)
+    batch: list[dict] = []
+    
+    async def flush() -> None:
+        await send_callback({"t0": batch[0]["t"], "frames": batch})
+    
     try:
-        async for frame in generate_replay_frames(db, session_id, fps):
-            await send_callback(frame.model_dump())
+        async for frame in generate_replay_frames(session_id, fps):
+            batch.append(frame)
+            if len(batch) >= batch_size:
+                await flush()
+                batch = []
+        
+        if batch:
+            await flush()
     except Exception as e:
         logger.error(f"Error during replay: {str(e)}")
-        raise
\ No newline at end of file
+        raise